@@ -1,28 +1,43 @@
-from flask import Flask, render_template, request, redirect, session, url_for, jsonify, current_app
-from flask_session import Session
+from flask import Flask, render_template, request, redirect, session, url_for, jsonify
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import func, desc
+import sqlalchemy
+from sqlalchemy import func, desc, bindparam, event
+from sqlalchemy.dialects import sqlite, postgresql
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from collections import defaultdict, Counter
 from flask_login import UserMixin, LoginManager, login_user, login_required, logout_user, current_user
 from datetime import datetime, timedelta
 import pytz
 from flask_bcrypt import Bcrypt
-import requests
-from collections import defaultdict
-from bokeh.embed import components
-from bokeh.plotting import figure
-from random import choice
+import threading
+import os
+from random import randint
 import math
+from word_index import WordIndex
+from finder import Constraints
+from feedback_matrix import FeedbackMatrix, MATRIX_FILE, MATRIX_WORDS_FILE
+from event_writer import EventWriter
+from search_counter import SearchCounter
+from chart_cache import ChartCache
+from word_stats import WordStats
+from user_cache import UserCache, CachedUser
+from database_config import database_url, engine_options, install_sqlite_pragmas, env_int
+from session_config import configure_session, secret_key
 
 app = Flask(__name__)
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///words.db'
+# database and its pool / sqlite pragmas are set from environment, see database_config.py
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = 'this_key'
+app.config['SECRET_KEY'] = secret_key(app)
 db = SQLAlchemy(app)
+with app.app_context():
+    install_sqlite_pragmas(db.engine)
 
-app.config["SESSION_PERMANENT"] = False
-app.config["SESSION_TYPE"] = "filesystem"
-Session(app)
+# signed cookie by default, server side store (memory / sqlalchemy / redis) is chosen in session_config.py
+configure_session(app, db)
 
 bcrypt = Bcrypt(app)
 
@@ -32,9 +47,25 @@ login_manager.login_view = "login"
 
 POLAND_TZ = pytz.timezone('Europe/Warsaw')
 
+
+# [start, end) of day, `start <= column < end` can use index of column, func.date(column) == day can not
+def day_range(day):
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+# users are cached for USER_CACHE_TTL seconds, routes changing user have to call user_cache.invalidate(id)
+user_cache = UserCache(max_size=env_int('USER_CACHE_SIZE', 1024), ttl=env_int('USER_CACHE_TTL', 60))
+
+
+def load_cached_user(user_id):
+    row = db.session.query(User.id, User.username, User.role_id, Role.name)\
+        .outerjoin(Role, Role.id == User.role_id).filter(User.id == user_id).first()
+    return CachedUser(*row) if row else None
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(user_id)
+    return user_cache.get_or_load(int(user_id), load_cached_user)
 
 
 ###################################################################################################################################
@@ -56,13 +87,14 @@ class Role(db.Model):
 class Word(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.String(5), nullable=False, unique=True) # the word to be exact
-    searched = db.Column(db.Integer, nullable=False)
+    searched = db.Column(db.Integer, nullable=False, index=True)
     definition = db.Column(db.String(50000), nullable=True)
-    last_search = db.Column(db.DateTime, nullable=True)
-    last_as_word_of_the_day = db.Column(db.DateTime, nullable=True)
-    last_as_word_of_literally = db.Column(db.DateTime, nullable=True)
+    last_search = db.Column(db.DateTime, nullable=True, index=True)
+    last_as_word_of_the_day = db.Column(db.DateTime, nullable=True, index=True)
+    last_as_word_of_literally = db.Column(db.DateTime, nullable=True, index=True)
     source = db.Column(db.String(500), nullable=False)
-    added_by = db.Column(db.String(500), nullable=False)
+    added_by = db.Column(db.String(500), nullable=False, index=True)
+    removed_from_dictionary = db.Column(db.DateTime, nullable=True) # set by words_import.py --sync when word is gone from word list
 
     def to_dict(self):
         return {
@@ -79,24 +111,29 @@ class Word(db.Model):
 class Proposal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(5), nullable=True, unique=True)
-    date = db.Column(db.DateTime, default=datetime.utcnow)
+    date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     reasoning = db.Column(db.String(5000), nullable=True)
     user = db.Column(db.String(50), nullable=False)
     upvoted = db.Column(db.Integer, nullable=False, default=1)
 
 class History(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    flag = db.Column(db.String(3), db.ForeignKey('flags.name'))
+    flag = db.Column(db.String(3), index=True)  # Flags.name, not a foreign key because names of Flags are not unique
     date = db.Column(db.DateTime, default=datetime.utcnow)
     title = db.Column(db.String(5000), nullable=False)
     description = db.Column(db.String(5000), nullable=True)
-    user = db.Column(db.String(50), nullable=False)
+    user = db.Column(db.String(50), nullable=False, index=True)
+
+    # history pages are read newest first, filtered by flag or user pages need their own (date, id) order
+    __table_args__ = (db.Index('ix_history_date_id', 'date', 'id'),
+                      db.Index('ix_history_flag_date_id', 'flag', 'date', 'id'),
+                      db.Index('ix_history_user_date_id', 'user', 'date', 'id'))
 
 class Flags(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(3), nullable=False)
     description = db.Column(db.String(5000), nullable=False)
-    events = db.relationship('History', backref='flags')
+    events = db.relationship('History', backref='flags', primaryjoin='Flags.name == foreign(History.flag)')
 
 class NotificationToUser(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -109,6 +146,194 @@ class Notifications(db.Model):
     description = db.Column(db.String(5000), nullable=True)
     back_reference = db.Column(db.String(5000), nullable=True)
 
+# number of words starting with each letter, kept up to date on every Word insert and delete
+class WordFirstLetter(db.Model):
+    letter = db.Column(db.String(1), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# adds change to count column of rows with given keys, missing rows are inserted with max(change, 0)
+# rows - list of dicts with primary key columns and 'change'
+# one INSERT ... ON CONFLICT DO UPDATE, so two transactions can not both insert the same new key
+def change_counts(connection, table, rows):
+    if not rows:
+        return
+    keys = [column.name for column in table.primary_key.columns]
+    if connection.dialect.name in ('sqlite', 'postgresql'):
+        insert = (sqlite if connection.dialect.name == 'sqlite' else postgresql).insert(table)
+        statement = insert.values(count=bindparam('initial')).on_conflict_do_update(
+            index_elements=keys, set_={'count': table.c.count + bindparam('change')})
+        connection.execute(statement, [dict(row, initial=max(row['change'], 0)) for row in rows])
+        return
+    for row in rows:
+        where = [table.c[key] == row[key] for key in keys]
+        result = connection.execute(table.update().where(*where).values(count=table.c.count + row['change']))
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(**{key: row[key] for key in keys}, count=max(row['change'], 0)))
+
+
+def change_first_letter_count(connection, content, change):
+    if not content:
+        return
+    change_counts(connection, WordFirstLetter.__table__, [{'letter': content[0].lower(), 'change': change}])
+
+
+@event.listens_for(Word, 'after_insert')
+def word_inserted(mapper, connection, target):
+    change_first_letter_count(connection, target.content, 1)
+
+
+@event.listens_for(Word, 'after_delete')
+def word_deleted(mapper, connection, target):
+    change_first_letter_count(connection, target.content, -1)
+
+
+# count all first letters again with one GROUP BY, used to fill table first time and after bulk imports
+def rebuild_first_letter_counts():
+    first_letter = func.lower(func.substr(Word.content, 1, 1))
+    counts = db.session.query(first_letter, func.count(Word.id)).group_by(first_letter).all()
+    db.session.query(WordFirstLetter).delete()
+    db.session.add_all([WordFirstLetter(letter=letter, count=count) for letter, count in counts])
+    db.session.commit()
+    chart_cache.bump(Word.__tablename__)
+
+
+# number of History events per day, flag and user, kept up to date when events are written or deleted
+# analysis charts read from here, so they do not depend on size of History
+class HistoryDailyRollup(db.Model):
+    __tablename__ = 'history_daily_rollup'
+    day = db.Column(db.Date, primary_key=True)
+    flag = db.Column(db.String(3), primary_key=True)  # '' for events without flag
+    user = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+def history_rollup_key(date, flag, user):
+    return (date.date(), flag or '', user)
+
+
+# counts - {(day, flag, user): change}
+def change_history_rollup(connection, counts):
+    change_counts(connection, HistoryDailyRollup.__table__,
+                  [{'day': day, 'flag': flag, 'user': user, 'change': change} for (day, flag, user), change in counts.items()])
+
+
+@event.listens_for(History, 'after_insert')
+def history_inserted(mapper, connection, target):
+    change_history_rollup(connection, {history_rollup_key(target.date, target.flag, target.user): 1})
+
+
+@event.listens_for(History, 'after_delete')
+def history_deleted(mapper, connection, target):
+    change_history_rollup(connection, {history_rollup_key(target.date, target.flag, target.user): -1})
+
+
+# count whole History again, used to fill rollup first time (see backfill_history_rollup.py)
+def rebuild_history_rollup():
+    day = func.date(History.date)
+    counts = db.session.query(day, History.flag, History.user, func.count(History.id))\
+        .group_by(day, History.flag, History.user).all()
+    db.session.query(HistoryDailyRollup).delete()
+    rollup = defaultdict(int)
+    for event_day, flag, user, count in counts:
+        if event_day is None:
+            continue
+        if isinstance(event_day, str):
+            event_day = datetime.strptime(event_day, '%Y-%m-%d').date()
+        rollup[(event_day, flag or '', user)] += count
+    db.session.add_all([HistoryDailyRollup(day=day, flag=flag, user=user, count=count) for (day, flag, user), count in rollup.items()])
+    db.session.commit()
+    chart_cache.bump(History.__tablename__)
+    return len(rollup)
+
+
+# analysis chart data, cached until table it is made from (word or history) is changed
+# ORM changes only mark session, version is bumped after commit, so charts are never built again from not committed data
+# bulk writes (event writer, search counter, rebuilds) bump it themselves
+# other processes can not bump it, so every entry also keeps signature of its tables read from database:
+# word - number of words (sum of word_first_letter), last id and last search, history - number of events
+# (sum of history_daily_rollup) and last id, small tables and indexed max() keep it cheap
+def chart_tables_version(tables):
+    columns = []
+    if 'word' in tables:
+        columns += [func.sum(WordFirstLetter.count), func.max(Word.id), func.max(Word.last_search)]
+    if 'history' in tables:
+        columns += [func.sum(HistoryDailyRollup.count), func.max(History.id)]
+    return tuple(db.session.query(*[db.select(column).scalar_subquery() for column in columns]).one())
+
+
+chart_cache = ChartCache(shared_version=chart_tables_version)
+
+
+def mark_chart_data_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_chart_tables', set()).add(mapper.local_table.name)
+
+
+for model in (Word, History):
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, name, mark_chart_data_changed)
+
+
+@event.listens_for(OrmSession, 'after_commit')
+def chart_data_committed(session):
+    for table in session.info.pop('changed_chart_tables', ()):
+        chart_cache.bump(table)
+
+
+@event.listens_for(OrmSession, 'after_rollback')
+def chart_data_rolled_back(session):
+    session.info.pop('changed_chart_tables', None)
+
+
+# route and its query args, charts of last days also depend on today's date
+def chart_cache_key(date_relative=False):
+    key = (request.path, tuple(sorted(request.args.items(multi=True))))
+    return key + (datetime.utcnow().date(),) if date_relative else key
+
+
+# adds nullable columns which are in models but not yet in existing database tables
+def add_missing_columns():
+    inspector = sqlalchemy.inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    connection.exec_driver_sql(f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}')
+
+
+# creates tables, columns and indexes added after first release and fills them, safe to run many times
+def prepare_database():
+    db.create_all()
+    add_missing_columns()
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    if db.session.query(WordFirstLetter.letter).first() is None and db.session.query(Word.id).first() is not None:
+        rebuild_first_letter_counts()
+    if db.session.query(HistoryDailyRollup.day).first() is None and db.session.query(History.id).first() is not None:
+        rebuild_history_rollup()
+
+
+# database is upgraded once per process before first request, also when app is not started with `python app.py`
+database_prepared = False
+database_prepare_lock = threading.Lock()
+
+
+@app.before_request
+def prepare_database_once():
+    global database_prepared
+    if database_prepared:
+        return
+    with database_prepare_lock:
+        if not database_prepared:
+            prepare_database()
+            database_prepared = True
+
 ###################################################################################################################################
 #   Validators
 ###################################################################################################################################
@@ -170,19 +395,50 @@ def log_event():
         return jsonify({"error": f"Failed to log error: {str(e)}"}), 500
 
 
+# save batch of events from event_writer in one transaction
+def write_events(events):
+    with app.app_context():
+        try:
+            db.session.execute(History.__table__.insert(), events)
+            change_history_rollup(db.session.connection(), Counter(history_rollup_key(e['date'], e['flag'], e['user']) for e in events))
+            db.session.commit()
+            chart_cache.bump(History.__tablename__)
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+event_writer = EventWriter(write_events)
+
+
 def log_events(flag, title, description):
-    payload = {
-            "flag": flag,
-            "title": title,
-            "description": str(description) if description else None,
-            "username": session.get('username', 'unknown'),
-            "timestamp": datetime.now(POLAND_TZ).isoformat()
-        }
-    try:
-        response = requests.post("http://127.0.0.1:80/log_event", json=payload)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as req_e:
-        current_app.logger.error(f"Failed to make a call to logging endpoint: {req_e}")
+    event_writer.put({
+        "flag": flag,
+        "title": title,
+        "description": str(description) if description else None,
+        "user": session.get('username', 'unknown'),
+        "date": datetime.now(POLAND_TZ)
+    })
+
+
+# hits and misses of rendered charts cache
+@app.route('/chart_cache/stats', methods=['GET'])
+@login_required
+def chart_cache_stats():
+    if 1 == current_user.role_id:
+        return jsonify(chart_cache.stats()), 200
+    else:
+        return jsonify({"error": "You dont have permission to see chart cache stats"}), 403
+
+
+# counters of event writer, to see if any events are lost
+@app.route('/log_event/stats', methods=['GET'])
+@login_required
+def log_event_stats():
+    if 1 == current_user.role_id:
+        return jsonify(event_writer.stats()), 200
+    else:
+        return jsonify({"error": "You dont have permission to see event writer stats"}), 403
 
 
 ###################################################################################################################################
@@ -193,21 +449,27 @@ def log_events(flag, title, description):
 @login_required
 def see_word_of_the_day():
     try:
-        call_for_word_of_the_day()
+        word_id = call_for_word_of_the_day()
         today = datetime.now(POLAND_TZ).date()
-        word_to_show = db.session.query(Word).filter(Word.last_as_word_of_the_day != None).order_by(Word.last_as_word_of_the_day.desc()).first()
-        
-        if today != word_to_show.last_as_word_of_the_day.date():
+        word_to_show = db.session.get(Word, word_id) if word_id is not None else None
+
+        # word could be changed by other process (e.g. modify_last_word_of_the_day.py), then choose again
+        if word_to_show is not None and (word_to_show.last_as_word_of_the_day is None or today != word_to_show.last_as_word_of_the_day.date()):
+            word_of_the_day_cache.clear()
+            word_id = call_for_word_of_the_day()
+            word_to_show = db.session.get(Word, word_id) if word_id is not None else None
+
+        if word_to_show is None or today != word_to_show.last_as_word_of_the_day.date():
             title = 'There was an issue while looking for word of the day'
-            log_events(flag='ER?', title=title, description=e)
+            log_events(flag='ER?', title=title, description=None)
             return render_template('error_page.html', message=title)
         else:
             todays_last_as_word_of_literally = False
             previous_page = 'word_of_the_day'
             title = 'Word of the day!'
-            word_to_show.searched += 1
             try:
-                db.session.commit()
+                search_counter.hit(word_to_show.id)
+                show_with_pending_searches(word_to_show)
                 log_events(flag='SRC', title=f'Searched for word with {word_to_show.content}', description=None)
                 return render_template('show_word.html', word=word_to_show, previous_page=previous_page, todays_last_as_word_of_literally=todays_last_as_word_of_literally, title=title)
             except Exception as e:
@@ -221,64 +483,106 @@ def see_word_of_the_day():
         return render_template('error_page.html', message=title)
 
 
-@app.route('/set_word_of_the_day', methods=['GET', 'POST'])
-def set_word_of_the_day():
-    today = datetime.now(POLAND_TZ).date()
-    yesterday = today - timedelta(days=1)
+# pick random word which was never word of the day, every unused word has the same chance
+# random id from id range is looked up by primary key and taken only when such word exists and is unused,
+# so we never load whole pool of unused words; when many draws miss (few unused words left or big gaps in ids)
+# unused words are counted and one at random offset is read
+UNUSED_WORD_DRAWS = 32
 
-    recent_word = db.session.query(Word).filter(Word.last_as_word_of_the_day != None).order_by(Word.last_as_word_of_the_day.desc()).first()
 
-    if recent_word and recent_word.last_as_word_of_the_day.date() == today:
-        return jsonify({"message": "Today's word of the day is already set."}), 200
+def pick_random_unused_word():
+    # two queries, sqlite reads min or max of primary key directly only when it is alone in query
+    min_id = db.session.query(func.min(Word.id)).scalar()
+    max_id = db.session.query(func.max(Word.id)).scalar()
+    if min_id is None:
+        return None
+    for _ in range(UNUSED_WORD_DRAWS):
+        word = db.session.get(Word, randint(min_id, max_id))
+        if word is not None and word.last_as_word_of_the_day is None:
+            return word
+    unused = db.session.query(Word).filter(Word.last_as_word_of_the_day == None)
+    count = unused.count()
+    if count == 0:
+        return None
+    return unused.order_by(Word.id).offset(randint(0, count - 1)).first()
 
-    if recent_word and recent_word.last_as_word_of_the_day.date() == yesterday:
-        available_words = db.session.query(Word).filter(Word.last_as_word_of_the_day == None).all()
-        if available_words:
-            random_word = choice(available_words)
-            random_word.last_as_word_of_the_day = today
-            db.session.commit()
-            return jsonify({"message": "Word for today has been set."}), 200
 
-    if recent_word and recent_word.last_as_word_of_the_day.date() < yesterday:
-        date_to_assign = recent_word.last_as_word_of_the_day.date() + timedelta(days=1)
-        available_words = db.session.query(Word).filter(Word.last_as_word_of_the_day == None).all()
+# assign word of the day for today and every missed day, all in one transaction
+# returns (list of assigned words, first assigned date), empty list when today is already set
+def assign_words_of_the_day(today):
+    recent_word = db.session.query(Word).filter(Word.last_as_word_of_the_day != None).order_by(Word.last_as_word_of_the_day.desc()).first()
 
-        while available_words:
-            random_word = choice(available_words)
-            random_word.last_as_word_of_the_day = date_to_assign
-            db.session.commit()
+    if recent_word and recent_word.last_as_word_of_the_day.date() >= today:
+        return [], None
 
-            if date_to_assign == today:
+    date_to_assign = recent_word.last_as_word_of_the_day.date() + timedelta(days=1) if recent_word else today
+    first_date = date_to_assign
+    assigned = []
+    try:
+        while date_to_assign <= today:
+            random_word = pick_random_unused_word()
+            if random_word is None:
                 break
-
+            random_word.last_as_word_of_the_day = date_to_assign
+            db.session.flush()
+            assigned.append(random_word)
             date_to_assign += timedelta(days=1)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return assigned, first_date
 
-            available_words = db.session.query(Word).filter(Word.last_as_word_of_the_day == None).all()
 
-        return jsonify({"message": f"Word of the day has been set from {recent_word.last_as_word_of_the_day.date()} to today."}), 200
+@app.route('/set_word_of_the_day', methods=['GET', 'POST'])
+def set_word_of_the_day():
+    today = datetime.now(POLAND_TZ).date()
+    try:
+        with word_of_the_day_lock:
+            assigned, first_date = assign_words_of_the_day(today)
+            word_of_the_day_cache.clear()
+    except Exception as e:
+        return jsonify({"error": f"Failed to set word of the day: {str(e)}"}), 500
 
-    available_words = db.session.query(Word).filter(Word.last_as_word_of_the_day == None).all()
-    if available_words:
-        random_word = choice(available_words)
-        random_word.last_as_word_of_the_day = today
-        db.session.commit()
-        return jsonify({"message": f"Word of the day has been set to {random_word.content}."}), 200
-    else:
+    if first_date is None:
+        return jsonify({"message": "Today's word of the day is already set."}), 200
+    if not assigned:
         return jsonify({"error": "No words available for setting as word of the day."}), 404
+    if len(assigned) > 1:
+        return jsonify({"message": f"Word of the day has been set from {first_date} to today."}), 200
+    return jsonify({"message": f"Word of the day has been set to {assigned[-1].content}."}), 200
+
+
+# today's word of the day is kept in memory, keyed by date in Poland, so next day it is chosen again
+word_of_the_day_cache = {}
+word_of_the_day_lock = threading.Lock()
 
 
-# Funkcja, która wywołuje /set_word_of_the_day
+# returns id of today's word of the day, choosing it first if needed
+# only one thread chooses word, others wait for it and use cached id
 def call_for_word_of_the_day():
-    word_today = Word.query.filter(func.date(Word.last_as_word_of_the_day) == datetime.now(POLAND_TZ).date()).all()
-    if word_today:
-        return None
-    try:
-        response = requests.post("http://127.0.0.1:80/set_word_of_the_day")
-        response.raise_for_status()
-    except Exception as e:
-        title = 'There was an issue with choosing word of the day'
-        log_events(flag='ER?', title=title, description=e)
-        return render_template('error_page.html', message=title)
+    today = datetime.now(POLAND_TZ).date()
+    word_id = word_of_the_day_cache.get(today)
+    if word_id is not None:
+        return word_id
+
+    with word_of_the_day_lock:
+        word_id = word_of_the_day_cache.get(today)
+        if word_id is not None:
+            return word_id
+
+        assigned, _ = assign_words_of_the_day(today)
+        if assigned:
+            word_id = assigned[-1].id
+        else:
+            recent_word = db.session.query(Word).filter(Word.last_as_word_of_the_day != None).order_by(Word.last_as_word_of_the_day.desc()).first()
+            if recent_word is None or recent_word.last_as_word_of_the_day.date() != today:
+                return None
+            word_id = recent_word.id
+
+        word_of_the_day_cache.clear()
+        word_of_the_day_cache[today] = word_id
+        return word_id
 
 
 ###################################################################################################################################
@@ -415,6 +719,7 @@ def update_user(id):
             log_events(flag='ETU', title='Edit user', description=message)
             try:
                 db.session.commit()
+                user_cache.invalidate(id)
                 session['repited_user'] = False
                 return redirect('/all_users')
             except Exception as e:
@@ -440,6 +745,7 @@ def delete_user(id):
             try:
                 db.session.delete(user_to_delete)
                 db.session.commit()
+                user_cache.invalidate(id)
                 users = User.query.all()
                 log_events(flag='DEL', title='Delete user', description=f'Deleted user named: {user_to_delete.username}')
                 if len(users) > 0:
@@ -486,6 +792,7 @@ def edit_account():
             log_events(flag='ETU', title='Edit user', description=message)
             try:
                 db.session.commit()
+                user_cache.invalidate(user_to_update.id)
                 session['repited_user'] = False
                 return redirect('/menu')
             except Exception as e:
@@ -515,11 +822,58 @@ def all_words():
         return render_template('error_page.html', message=title)
 
 
-# get data for all_words page
+WORDS_DATA_COLUMNS = {
+    'content': Word.content,
+    'searched': Word.searched,
+    'definition': func.substr(Word.definition, 1, 200),
+    'last_search': Word.last_search,
+    'last_as_word_of_the_day': Word.last_as_word_of_the_day,
+    'last_as_word_of_literally': Word.last_as_word_of_literally,
+    'source': Word.source,
+    'added_by': Word.added_by
+}
+WORDS_DATA_ORDERABLE = ['content', 'searched', 'last_search', 'last_as_word_of_the_day', 'last_as_word_of_literally', 'added_by']
+WORDS_DATA_MAX_LENGTH = 100
+
+
+# get data for all_words page, DataTables server-side processing
+# paging, searching (content starts with) and ordering are done in sql, definitions are shortened
 @app.route('/api/words_data')
 @login_required
 def words_data():
-    return {'data': [word.to_dict() for word in Word.query]}
+    draw = request.args.get('draw', 0, type=int)
+    start = max(request.args.get('start', 0, type=int), 0)
+    length = request.args.get('length', 10, type=int)
+    if length < 1 or length > WORDS_DATA_MAX_LENGTH:
+        length = WORDS_DATA_MAX_LENGTH
+    search = request.args.get('search[value]', '').strip().lower()
+
+    query = db.session.query(*[column.label(name) for name, column in WORDS_DATA_COLUMNS.items()])
+    records_total = db.session.query(func.count(Word.id)).scalar()
+    records_filtered = records_total
+    if search:
+        # range instead of LIKE, so unique index on content can be used
+        query = query.filter(Word.content >= search, Word.content < search + '\uffff')
+        records_filtered = db.session.query(func.count(Word.id)).filter(Word.content >= search, Word.content < search + '\uffff').scalar()
+
+    order_column = request.args.get('order[0][column]', type=int)
+    order_name = request.args.get(f'columns[{order_column}][data]') if order_column is not None else None
+    if order_name in WORDS_DATA_ORDERABLE:
+        column = WORDS_DATA_COLUMNS[order_name]
+        if request.args.get('order[0][dir]') == 'desc':
+            query = query.order_by(column.desc(), Word.id.desc())
+        else:
+            query = query.order_by(column.asc(), Word.id.asc())
+    else:
+        query = query.order_by(Word.id)
+
+    rows = query.offset(start).limit(length).all()
+    return {
+        'draw': draw,
+        'recordsTotal': records_total,
+        'recordsFiltered': records_filtered,
+        'data': [row._asdict() for row in rows]
+    }
 
 
 # page to add new word to database
@@ -561,6 +915,8 @@ def add_word():
                 else:
                     log_events(flag='CRP', title=f'Upvoted proposal for: {content}', description=None)
                 db.session.commit()
+                if True == x:
+                    word_index.add(new_record.id, new_record.content)
                 session['word_already_exists']=False
                 return redirect('/menu')
             except Exception as e:
@@ -580,7 +936,13 @@ def edit_word(id):
         word_to_edit = Word.query.get_or_404(id)
         if request.method == 'POST':
             try:
-                word_to_edit.searched = request.form.get('searched', word_to_edit.searched)
+                # form shows searched together with hits still waiting in search_counter, only value changed by admin
+                # replaces them, otherwise they stay in buffer and are added to database by next flush
+                searched = request.form.get('searched', type=int)
+                shown_searched = request.form.get('shown_searched', type=int)
+                if searched is not None and searched != shown_searched:
+                    search_counter.discard(word_to_edit.id)
+                    word_to_edit.searched = searched
                 word_to_edit.definition = request.form.get('definition', word_to_edit.definition)
                 word_to_edit.source += f" Also changed by {session['username']}"
 
@@ -598,7 +960,7 @@ def edit_word(id):
                 log_events(flag='ER?', title=title, description=e)
                 return render_template('error_page.html', message=title)
         else:
-            return render_template('edit_word.html', word=word_to_edit)
+            return render_template('edit_word.html', word=show_with_pending_searches(word_to_edit))
     else:
         title = "permission to edit words"
         log_events(flag='ER!', title=f'No {title}', description=None)
@@ -611,7 +973,8 @@ def edit_word(id):
 def word_of_literally(id):
     if current_user.role_id != 3:
         word_to_edit = Word.query.get_or_404(id)
-        word_today = Word.query.filter(func.date(Word.last_as_word_of_literally) == datetime.now(POLAND_TZ).date()).first()
+        day_start, day_end = day_range(datetime.now(POLAND_TZ).date())
+        word_today = Word.query.filter(Word.last_as_word_of_literally >= day_start, Word.last_as_word_of_literally < day_end).first()
         if word_today:
             description = f"Word of the literally has been found for today and it is {word_today.content}"
             log_events(flag='LG!', title='Logic error', description=description)
@@ -714,6 +1077,7 @@ def accept_proposal(id):
             db.session.delete(proposal_to_delete)
             db.session.add(new_word)
             db.session.commit()
+            word_index.add(new_word.id, new_word.content)
             log_events(flag='ACP', title=f'Accept proposal : {content}', description=None)
             proposals = Proposal.query.all()
             if len(proposals) > 0:
@@ -759,42 +1123,61 @@ def big_search():
     return render_template('big_search.html')
 
 
-@app.route('/found_words', methods=['GET'])
-@login_required
-def found_words():
+word_index = WordIndex()
+word_index_build_lock = threading.Lock()
+
+
+# words added in this process go to index at once (word_index.add), words added by other workers or by
+# words_import.py change number of words or last id of Word table, then index is built again before search
+def get_word_index():
+    version = tuple(db.session.query(func.count(Word.id), func.max(Word.id)).one())
+    if word_index.version() != version:
+        with word_index_build_lock:
+            if word_index.version() != version:
+                word_index.build(db.session.query(Word.id, Word.content).all())
+    return word_index
+
+
+# get Word rows by ids in chunks, so we do not hit sqlite's limit of query parameters
+def get_words_by_ids(ids, chunk_size=900):
+    ids = sorted(ids)
+    words = []
+    for i in range(0, len(ids), chunk_size):
+        words.extend(Word.query.filter(Word.id.in_(ids[i:i + chunk_size])).all())
+    return words
+
+
+# finder filters from query string of /found_words, returns (Constraints, description of used filters)
+def get_finder_constraints():
     include_filter = request.args.get('includeFilter', '').lower()
     not_in_word_filter = request.args.get('notInWordFilter', '').lower()
     exact_place_str = request.args.get('exactPlaceFilters', '').lower()
 
     exact_place_filters = exact_place_str.split(',')
     filters = ''
-    query = Word.query
+    include = []
+    exclude = []
 
     if include_filter:
         filters += '[Letters word include filter]'
-        for letter in include_filter.split('-'):
-            if letter:
-                query = query.filter(Word.content.ilike(f'%{letter}%'))
+        include = [letter for letter in include_filter.split('-') if letter]
 
     if not_in_word_filter:
         filters += '[Letters not in word filter]'
-        for letter in not_in_word_filter.split('-'):
-            if letter:
-                query = query.filter(~Word.content.ilike(f'%{letter}%'))
+        exclude = [letter for letter in not_in_word_filter.split('-') if letter]
 
-    if exact_place_filters:
+    if any(letter and letter != '-' for letter in exact_place_filters):
         filters += '[Letters exactly on place word filter]'
-        pattern = ''
-        for letter in exact_place_filters:
-            if letter == '-':
-                pattern += '_'
-            else:
-                pattern += letter
 
-        if pattern:
-            query = query.filter(Word.content.like(pattern))
+    return Constraints.from_filters(include=include, exclude=exclude, positions=exact_place_filters), filters
 
-    matching_words = query.all()
+
+@app.route('/found_words', methods=['GET'])
+@login_required
+def found_words():
+    constraints, filters = get_finder_constraints()
+    matching_ids = get_word_index().search_constraints(constraints)
+    matching_words = get_words_by_ids(matching_ids)
     
     try:
         log_events(flag='SRC', title=f'Searched for word with {filters}', description=None)
@@ -805,18 +1188,107 @@ def found_words():
         render_template('error_page.html', message=title)
 
 
+# matrix is built offline (python feedback_matrix.py) and opened again when its files are replaced by new build
+feedback_matrix_cache = {}
+feedback_matrix_lock = threading.Lock()
+
+
+# (inode, mtime) of matrix and its word list, os.replace of new build changes both
+def feedback_matrix_version():
+    return tuple((stat.st_ino, stat.st_mtime_ns) for stat in map(os.stat, (MATRIX_FILE, MATRIX_WORDS_FILE)))
+
+
+def get_feedback_matrix():
+    version = feedback_matrix_version()
+    with feedback_matrix_lock:
+        if feedback_matrix_cache.get('version') != version:
+            try:
+                feedback_matrix_cache['matrix'] = FeedbackMatrix.load()
+                feedback_matrix_cache['version'] = version
+            except ValueError:
+                # new word list is in place but matrix not yet (or the other way), old matrix is used meanwhile
+                if 'matrix' not in feedback_matrix_cache:
+                    raise
+        return feedback_matrix_cache['matrix']
+
+
+# matrix is stale when words in database differ from its word list (words added, imported or removed after build),
+# compared once for every version of word index and matrix
+def feedback_matrix_is_stale(matrix, index):
+    key = (feedback_matrix_cache.get('version'), index.version())
+    stale = feedback_matrix_cache.get('stale')
+    if stale is None or stale[0] != key:
+        stale = (key, index.words() != set(matrix.positions))
+        feedback_matrix_cache['stale'] = stale
+    return stale[1]
+
+
+# best next guesses for words matching /found_words filters, ranked by expected information (entropy)
+# candidates which are not in matrix are not ranked, 'unranked_candidates' and 'matrix_stale' tell about them
+@app.route('/api/best_guess', methods=['GET'])
+@login_required
+def best_guess():
+    try:
+        matrix = get_feedback_matrix()
+    except (OSError, ValueError) as e:
+        log_events(flag='ER!', title='Feedback matrix is not available', description=e)
+        return jsonify({"error": "Feedback matrix is not built yet, run python feedback_matrix.py"}), 503
+
+    constraints, _ = get_finder_constraints()
+    index = get_word_index()
+    candidates = [index.contents[id] for id in index.search_constraints(constraints)]
+    top = max(1, min(request.args.get('top', 10, type=int), 100))
+    hard_mode = request.args.get('hardMode', '') == '1'
+    ranking, ranked = matrix.rank(candidates, top=top, hard_mode=hard_mode)
+    return jsonify({
+        'candidates': ranked,
+        'unranked_candidates': len(candidates) - ranked,
+        'matrix_stale': feedback_matrix_is_stale(matrix, index),
+        'guesses': [{'word': word, 'entropy': round(entropy, 3), 'candidate': candidate} for word, entropy, candidate in ranking]
+    }), 200
+
+
+# save buffered searches from search_counter with one executemany UPDATE
+def write_search_counts(rows):
+    word_table = Word.__table__
+    statement = word_table.update()\
+        .where(word_table.c.id == bindparam('word_id'))\
+        .values(searched=word_table.c.searched + bindparam('hits'),
+                last_search=func.coalesce(bindparam('searched_at', type_=db.DateTime), word_table.c.last_search))
+    with app.app_context():
+        try:
+            db.session.execute(statement, [{'word_id': row['id'], 'hits': row['count'], 'searched_at': row['last_search']} for row in rows])
+            db.session.commit()
+            chart_cache.bump(Word.__tablename__)
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+search_counter = SearchCounter(write_search_counts)
+
+
+# add not yet saved searches to word, without marking it as changed in session
+def show_with_pending_searches(word):
+    count, last_search = search_counter.pending(word.id)
+    if count:
+        set_committed_value(word, 'searched', word.searched + count)
+    if last_search is not None:
+        set_committed_value(word, 'last_search', last_search)
+    return word
+
+
 @app.route('/show/word_<int:id>/<string:previous_page>', methods=['GET', 'POST'])
 @login_required
 def show_word(id, previous_page):
     word_to_show = Word.query.get_or_404(id)
-    word_to_show.searched += 1
-    word_to_show.last_search = datetime.now(POLAND_TZ)
     todays_last_as_word_of_literally = True
     title = 'Selected word to show'
     if word_to_show.last_as_word_of_literally == datetime.now(POLAND_TZ).date():
         todays_last_as_word_of_literally = False
     try:
-        db.session.commit()
+        search_counter.hit(word_to_show.id, datetime.now(POLAND_TZ))
+        show_with_pending_searches(word_to_show)
         log_events(flag='SRC', title=f'Searched for word with {word_to_show.content}', description=None)
         return render_template('show_word.html', word=word_to_show, previous_page=previous_page, todays_last_as_word_of_literally=todays_last_as_word_of_literally, title=title)
     except Exception as e:
@@ -831,14 +1303,64 @@ def show_word(id, previous_page):
 ###################################################################################################################################
 
 
+HISTORY_PAGE_SIZE = 50
+
+
+def history_page_query(flags, user, before_date, before_id, limit):
+    query = History.query
+    if flags:
+        query = query.filter(History.flag.in_(flags))
+    if user:
+        query = query.filter(History.user == user)
+    if before_date is not None and before_id is not None:
+        query = query.filter(db.or_(History.date < before_date, db.and_(History.date == before_date, History.id < before_id)))
+    return query.order_by(History.date.desc(), History.id.desc()).limit(limit).all()
+
+
+# one page of History, newest first, using keyset (date, id) of last shown event instead of OFFSET
+# returns (events, (date, id) of last event or None if there are no more events)
+# with many flags every flag is read in (flag, date, id) order of its index and pages are merged here,
+# one query with IN (...) would sort all events of these flags
+def get_history_page(flags=None, user=None, before_date=None, before_id=None, limit=HISTORY_PAGE_SIZE):
+    if flags and len(flags) > 1:
+        events = []
+        for flag in set(flags):
+            events += history_page_query([flag], user, before_date, before_id, limit + 1)
+        events.sort(key=lambda event: (event.date or datetime.min, event.id), reverse=True)
+        events = events[:limit + 1]
+    else:
+        events = history_page_query(flags, user, before_date, before_id, limit + 1)
+    if len(events) > limit:
+        events = events[:limit]
+        return events, (events[-1].date, events[-1].id)
+    return events, None
+
+
+# filters and cursor of history page from query string
+def get_history_page_args():
+    flags = [flag for flag in request.args.getlist('flag') if flag]
+    user = request.args.get('user', '').strip() or None
+    before_date = request.args.get('before_date', '').strip()
+    before_date = datetime.fromisoformat(before_date) if before_date else None
+    before_id = request.args.get('before_id', type=int)
+    return flags, user, before_date, before_id
+
+
+def history_cursor_to_dict(cursor):
+    if cursor is None:
+        return None
+    return {'before_date': cursor[0].isoformat(), 'before_id': cursor[1]}
+
+
 @app.route('/history', methods=['GET'])
 @login_required
 def history():
     if 1 == current_user.role_id:
         try:
             flags = Flags.query.order_by(Flags.name).all()
-            events = History.query.order_by(History.date.desc()).all()
-            return render_template('history.html', events=events, flags=flags)
+            selected_flags, user, before_date, before_id = get_history_page_args()
+            events, cursor = get_history_page(selected_flags, user, before_date, before_id)
+            return render_template('history.html', events=events, flags=flags, selected_flags=selected_flags, user=user or '', cursor=history_cursor_to_dict(cursor))
         except Exception as e:
             title = 'There was an issue getting events'
             log_events(flag='ER?', title=title, description=e)
@@ -849,15 +1371,43 @@ def history():
         return render_template('error_page.html', message=f'You dont have {title}')
 
 
+# next pages of history page, loaded by history.html when scrolling / filtering
+@app.route('/api/history_events', methods=['GET'])
+@login_required
+def history_events():
+    if 1 == current_user.role_id:
+        try:
+            flags, user, before_date, before_id = get_history_page_args()
+            events, cursor = get_history_page(flags, user, before_date, before_id)
+            return jsonify({
+                'events': [
+                    {
+                        'id': event.id,
+                        'flag': event.flag,
+                        'title': event.title if len(event.title) <= 150 else event.title[:150] + ' ...',
+                        'user': event.user,
+                        'date': event.date.strftime("%d %B %Y %H:%M") if event.date else ''
+                    }
+                    for event in events
+                ],
+                'next': history_cursor_to_dict(cursor)
+            }), 200
+        except ValueError as e:
+            return jsonify({"error": f"Wrong filters: {str(e)}"}), 400
+    else:
+        return jsonify({"error": "You dont have permission to look into history"}), 403
+
+
 @app.route('/delete/events')
 @login_required
 def deleting():
     if 1 == current_user.role_id:
-        events = History.query.order_by(History.date).all()
-        if events:
+        if db.session.query(History.id).first() is not None:
             try:
                 History.query.delete()
+                HistoryDailyRollup.query.delete()
                 db.session.commit()
+                chart_cache.bump(History.__tablename__)
                 log_events(flag='ER?', title='History cleared', description=None)
                 return render_template('loading_page.html')
             except Exception as e:
@@ -883,8 +1433,7 @@ def delete_event(id):
         try:
             db.session.delete(event_to_delete)
             db.session.commit()
-            history = History.query.all()
-            if len(history) > 0:
+            if db.session.query(History.id).first() is not None:
                 return redirect('/history')
             else:
                 return redirect('/menu')
@@ -936,28 +1485,125 @@ def history_plots_menu():
         return render_template('error_page.html', message=f'You dont have {title}')
 
 
-def get_user_event_count():
-    results = defaultdict(int)
-    events = db.session.query(History.user).all()
-    for event in events:
-        results[event.user] += 1
-    return dict(results)
+# optional date range of charts from ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD, both days included
+def get_date_range_args():
+    date_from = request.args.get('date_from', '').strip()
+    date_to = request.args.get('date_to', '').strip()
+    date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+    date_to = datetime.strptime(date_to, '%Y-%m-%d').date() + timedelta(days=1) if date_to else None
+    return date_from, date_to
+
+
+def filter_rollup_days(query, date_from=None, date_to=None):
+    if date_from is not None:
+        query = query.filter(HistoryDailyRollup.day >= date_from)
+    if date_to is not None:
+        query = query.filter(HistoryDailyRollup.day < date_to)
+    return query
+
+
+def get_user_event_count(date_from=None, date_to=None):
+    total = func.sum(HistoryDailyRollup.count)
+    query = db.session.query(HistoryDailyRollup.user, total)
+    query = filter_rollup_days(query, date_from, date_to)
+    return dict(query.group_by(HistoryDailyRollup.user).having(total > 0).all())
+
+
+def get_event_count_by_flag(date_from=None, date_to=None):
+    total = func.sum(HistoryDailyRollup.count)
+    query = db.session.query(HistoryDailyRollup.flag, total)
+    query = filter_rollup_days(query, date_from, date_to)
+    return dict(query.group_by(HistoryDailyRollup.flag).having(total > 0).all())
+
+
+def get_event_count_by_specific_flag(flags, date_from=None, date_to=None):
+    total = func.sum(HistoryDailyRollup.count)
+    query = db.session.query(HistoryDailyRollup.flag, total).filter(HistoryDailyRollup.flag.in_(flags))
+    query = filter_rollup_days(query, date_from, date_to)
+    return dict(query.group_by(HistoryDailyRollup.flag).having(total > 0).order_by(HistoryDailyRollup.flag).all())
+
+
+# charts are drawn in browser by static/js/charts.js, server sends only data of plots from /api/charts/<name>
+def bar_plot_data(title, x, top, x_label, y_label="Count", color="navy", height=500, width=0.8, label_orientation="horizontal", legend=None):
+    return {
+        'type': 'bar',
+        'title': title,
+        'x': [str(value) for value in x],
+        'top': [int(value) for value in top],
+        'x_label': x_label,
+        'y_label': y_label,
+        'color': color,
+        'height': height,
+        'width': width,
+        'label_orientation': label_orientation,
+        'legend': legend
+    }
+
+
+# counts[i][j] is count for y[i] and x[j]
+def heatmap_plot_data(title, x, y, counts, x_label, y_label, height=700):
+    return {
+        'type': 'heatmap',
+        'title': title,
+        'x': list(x),
+        'y': list(y),
+        'counts': [[int(value) for value in row] for row in counts],
+        'x_label': x_label,
+        'y_label': y_label,
+        'height': height
+    }
+
+
+# /api/charts/<name> with the same query args as chart page
+def chart_data_url(name):
+    return url_for('chart_data', name=name, **request.args.to_dict(flat=False))
+
+
+def events_per_user_data():
+    user_event_counts = get_user_event_count(*get_date_range_args())
+    if not user_event_counts:
+        return None
 
+    users_sorted = sorted(user_event_counts.keys())
+    event_counts_sorted = [user_event_counts[user] for user in users_sorted]
+    return {'plots': [bar_plot_data("Events per User (Alphabetically)", users_sorted, event_counts_sorted, "Users", "Event Count",
+                                    color="blue", height=400, width=0.5, label_orientation=math.pi/4)]}
 
-def get_event_count_by_flag():
-    results = defaultdict(int)
-    events = db.session.query(History.flag).all()
-    for event in events:
-        results[event.flag] += 1
-    return dict(results)
 
+def events_per_flag_data():
+    flag_event_counts = get_event_count_by_flag(*get_date_range_args())
+    if not flag_event_counts:
+        return None
+
+    sorted_flags = sorted(flag_event_counts.keys())
+    event_counts_sorted = [flag_event_counts[flag] for flag in sorted_flags]
+    return {'plots': [bar_plot_data("Events per Flag (Alphabetically)", sorted_flags, event_counts_sorted, "Flags", "Event Count",
+                                    color="blue", height=400, width=0.5, label_orientation=math.pi/4)]}
+
+
+# flag_colors - {flag: color} of flags to show
+def specific_flags_data(title, flag_colors):
+    flags_count = get_event_count_by_specific_flag(list(flag_colors), *get_date_range_args())
+    if not flags_count:
+        return None
+
+    flags = list(flags_count.keys())
+    counts = list(flags_count.values())
+    colors = [flag_colors[flag] for flag in flags]
+    return {'plots': [bar_plot_data(title, flags, counts, "Event Flags", "Event Count",
+                                    color=colors, height=400, width=0.5, label_orientation=math.pi/4)]}
 
-def get_event_count_by_specific_flag(flags):
-    results = defaultdict(int)
-    events = db.session.query(History.flag).filter(History.flag.in_(flags)).all()
-    for event in events:
-        results[event.flag] += 1
-    return results
+
+def er_flags_data():
+    return specific_flags_data('Event Flags Distribution (ER? and ER!)', {'ER!': 'orange', 'ER?': 'red'})
+
+
+def cr_flags_data():
+    return specific_flags_data('Event Flags Distribution (CRP, CRW and CRU)', {'CRP': '#000000', 'CRU': '#ff0000', 'CRW': '#ffe100'})
+
+
+def edits_by_type_data():
+    return specific_flags_data('Edition Events Distribution (ETU and ETW)', {'ETU': '#00f59b', 'ETW': '#7014f2'})
 
 
 @app.route('/events_per_user')
@@ -965,30 +1611,7 @@ def get_event_count_by_specific_flag(flags):
 def events_per_user():
     if current_user.role_id == 1:
         try:
-            title = 'User Event Counts'
-            user_event_counts = get_user_event_count()
-
-            if not user_event_counts:
-                return render_template('error_page.html', message="No events found for any user.")
-
-            users_sorted = sorted(user_event_counts.keys())
-            event_counts_sorted = [user_event_counts[user] for user in users_sorted]
-
-            plot_sorted_by_name = figure(
-                x_range=users_sorted, 
-                title="Events per User (Alphabetically)",
-                height=400,
-                sizing_mode="stretch_width"
-            )
-            plot_sorted_by_name.vbar(x=users_sorted, top=event_counts_sorted, width=0.5, color="blue", alpha=0.7)
-            plot_sorted_by_name.xaxis.major_label_orientation = math.pi/4
-            plot_sorted_by_name.xaxis.axis_label = "Users"
-            plot_sorted_by_name.yaxis.axis_label = "Event Count"
-
-            script1, div1 = components(plot_sorted_by_name)
-            plot = [script1, div1]
-
-            return render_template('history_charts.html', plot=plot, title=title)
+            return render_template('history_charts.html', data_url=chart_data_url('events_per_user'), title='User Event Counts')
         except Exception as e:
             title = 'There was an issue displaying plot'
             log_events(flag='ER?', title=title, description=e)
@@ -1004,34 +1627,11 @@ def events_per_user():
 def events_per_flag():
     if current_user.role_id == 1:
         try:
-            flag_event_counts = get_event_count_by_flag()
-
-            if not flag_event_counts:
-                return render_template('error_page.html', message="No events found for any flag.")
-
-            sorted_flags = sorted(flag_event_counts.keys())
-            event_counts_sorted = [flag_event_counts[flag] for flag in sorted_flags]
-
-            plot_sorted_by_flag = figure(
-                x_range=sorted_flags, 
-                title="Events per Flag (Alphabetically)",
-                height=400,
-                sizing_mode="stretch_width"
-            )
-            plot_sorted_by_flag.vbar(x=sorted_flags, top=event_counts_sorted, width=0.5, color="blue", alpha=0.7)
-            plot_sorted_by_flag.xaxis.major_label_orientation = math.pi/4
-            plot_sorted_by_flag.xaxis.axis_label = "Flags"
-            plot_sorted_by_flag.yaxis.axis_label = "Event Count"
-
-            script, div = components(plot_sorted_by_flag)
-            plot = [script, div]
-
-            return render_template('history_charts.html', plot=plot, title="Events per Flag")
-
+            return render_template('history_charts.html', data_url=chart_data_url('events_per_flag'), title="Events per Flag")
         except Exception as e:
-                title = 'There was an issue displaying plot'
-                log_events(flag='ER?', title=title, description=e)
-                return render_template('error_page.html', message=title)
+            title = 'There was an issue displaying plot'
+            log_events(flag='ER?', title=title, description=e)
+            return render_template('error_page.html', message=title)
     else:
         title = 'permission to see analysis module'
         log_events(flag='ER!', title=f'No {title}', description=None)
@@ -1044,29 +1644,7 @@ def er_flags_bar_chart():
     if current_user.role_id == 1:
         try:
             title = 'Event Flags Distribution (ER? and ER!)'
-            er_flags_count = get_event_count_by_specific_flag(['ER?', 'ER!'])
-
-            if not er_flags_count:
-                return render_template('error_page.html', message="No events found with the specified flags.")
-
-            flags = list(er_flags_count.keys())
-            counts = list(er_flags_count.values())
-            
-            colors = ['orange', 'red']
-
-            plot = figure(x_range=flags, title=title, height=400,
-                          sizing_mode="stretch_width")
-
-            plot.vbar(x=flags, top=counts, width=0.5, color=colors, alpha=0.7)
-
-            plot.xaxis.axis_label = "Event Flags"
-            plot.yaxis.axis_label = "Event Count"
-            plot.xaxis.major_label_orientation = math.pi/4
-
-            script, div = components(plot)
-
-            return render_template('history_charts.html', plot=[script, div], title=title)
-
+            return render_template('history_charts.html', data_url=chart_data_url('er_flags'), title=title)
         except Exception as e:
             title = 'There was an issue displaying the bar chart'
             log_events(flag='ER?', title=title, description=str(e))
@@ -1084,29 +1662,7 @@ def cr_flags_bar_chart():
     if current_user.role_id == 1:
         try:
             title = 'Event Flags Distribution (CRP, CRW and CRU)'
-            er_flags_count = get_event_count_by_specific_flag(['CRP', 'CRW', 'CRU'])
-
-            if not er_flags_count:
-                return render_template('error_page.html', message="No events found with the specified flags.")
-
-            flags = list(er_flags_count.keys())
-            counts = list(er_flags_count.values())
-            
-            colors = ['#000000', '#ff0000', '#ffe100']
-
-            plot = figure(x_range=flags, title=title, height=400,
-                          sizing_mode="stretch_width")
-
-            plot.vbar(x=flags, top=counts, width=0.5, color=colors, alpha=0.7)
-
-            plot.xaxis.axis_label = "Event Flags"
-            plot.yaxis.axis_label = "Event Count"
-            plot.xaxis.major_label_orientation = math.pi/4
-
-            script, div = components(plot)
-
-            return render_template('history_charts.html', plot=[script, div], title=title)
-
+            return render_template('history_charts.html', data_url=chart_data_url('cr_flags'), title=title)
         except Exception as e:
             title = 'There was an issue displaying the bar chart'
             log_events(flag='ER?', title=title, description=str(e))
@@ -1124,29 +1680,7 @@ def all_edits_by_type():
     if current_user.role_id == 1:
         try:
             title = 'Edition Events Distribution (ETU and ETW)'
-            er_flags_count = get_event_count_by_specific_flag(['ETU', 'ETW'])
-
-            if not er_flags_count:
-                return render_template('error_page.html', message="No events found with the specified flags.")
-
-            flags = list(er_flags_count.keys())
-            counts = list(er_flags_count.values())
-            
-            colors = ['#00f59b', '#7014f2']
-
-            plot = figure(x_range=flags, title=title, height=400,
-                          sizing_mode="stretch_width")
-
-            plot.vbar(x=flags, top=counts, width=0.5, color=colors, alpha=0.7)
-
-            plot.xaxis.axis_label = "Event Flags"
-            plot.yaxis.axis_label = "Event Count"
-            plot.xaxis.major_label_orientation = math.pi/4
-
-            script, div = components(plot)
-
-            return render_template('history_charts.html', plot=[script, div], title=title)
-
+            return render_template('history_charts.html', data_url=chart_data_url('edits_by_type'), title=title)
         except Exception as e:
             title = 'There was an issue displaying the bar chart'
             log_events(flag='ER?', title=title, description=str(e))
@@ -1156,20 +1690,30 @@ def all_edits_by_type():
         title = 'permission to see analysis module'
         log_events(flag='ER!', title=f'No {title}', description=None)
         return render_template('error_page.html', message=f'You don’t have {title}')
-
 ###################################################################################################################################
 #   Analysis module
 ###################################################################################################################################
 
 
 def get_content_starts_with_count():
-    results = defaultdict(int)  # Domyślny słownik z zerami
     polski_alfabet = 'aąbcćdeęfghijklłmnńoópqrsśtuvwxyzźż'
-    for letter in polski_alfabet:
-        count = db.session.query(func.count()).filter(Word.content.like(f'{letter}%')).scalar()
-        if count > 0:
-            results[letter] = count
-    return dict(results)
+    counts = dict(db.session.query(WordFirstLetter.letter, WordFirstLetter.count).filter(WordFirstLetter.count > 0).all())
+    return {letter: counts[letter] for letter in polski_alfabet if letter in counts}
+
+
+# letter statistics are counted again only when set of words changed (other number of words or other last id)
+word_stats_cache = {}
+word_stats_lock = threading.Lock()
+
+
+def get_word_stats():
+    version = tuple(db.session.query(func.count(Word.id), func.max(Word.id)).one())
+    with word_stats_lock:
+        if word_stats_cache.get('version') != version:
+            words = [content for content, in db.session.query(Word.content).all()]
+            word_stats_cache['stats'] = WordStats(words)
+            word_stats_cache['version'] = version
+        return word_stats_cache['stats']
 
 
 def get_unique_added_by_count():
@@ -1254,61 +1798,161 @@ def analysis_bar_plots_menu():
 # CHARTS
 
 
+def word_starting_with_data():
+    result = get_content_starts_with_count()
+    sorted_result = dict(sorted(result.items(), key=lambda x:x[1]))
+    return {'plots': [
+        bar_plot_data("Number of Words Starting with Each Letter", result.keys(), result.values(), "Letters"),
+        bar_plot_data("Number of Words Starting with Each Letter", sorted_result.keys(), sorted_result.values(), "Letters")
+    ]}
+
+
+def letter_position_frequency_data():
+    stats = get_word_stats()
+    letters = list(stats.alphabet)
+    positions = [str(position + 1) for position in range(stats.word_length)]
+    sorted_result = sorted(zip(letters, stats.letters.tolist()), key=lambda x: x[1])
+    return {'plots': [
+        heatmap_plot_data("Letters on Each Position", positions, letters, stats.letter_position, "Position", "Letter"),
+        bar_plot_data("Frequency of Letters in All Words", [letter for letter, _ in sorted_result], [count for _, count in sorted_result], "Letters")
+    ]}
+
+
+def bigram_frequency_data():
+    stats = get_word_stats()
+    letters = list(stats.alphabet)
+    top_bigrams = list(reversed(stats.top_bigrams(30)))
+    return {'plots': [
+        heatmap_plot_data("Letter Followed by Letter", letters, letters, stats.bigrams, "Second letter", "First letter", height=900),
+        bar_plot_data("30 Most Common Letter Pairs", [bigram for bigram, _ in top_bigrams], [count for _, count in top_bigrams], "Letter pairs")
+    ]}
+
+
+def diacritics_distribution_data():
+    stats = get_word_stats()
+    sorted_result = dict(sorted(stats.diacritics.items(), key=lambda x: x[1]))
+    return {
+        'subtitle': f'{stats.words_with_diacritics} of {stats.words_count} words have at least one',
+        'plots': [
+            bar_plot_data("Occurrences of Polish Diacritics", stats.diacritics.keys(), stats.diacritics.values(), "Letters"),
+            bar_plot_data("Occurrences of Polish Diacritics", sorted_result.keys(), sorted_result.values(), "Letters")
+        ]
+    }
+
+
+def unique_added_by_count_data():
+    result = get_unique_added_by_count()
+    sorted_result = dict(sorted(result.items(), key=lambda x:x[1]))
+    return {'plots': [
+        bar_plot_data("Number of words added by users", result.keys(), result.values(), "Users"),
+        bar_plot_data("Number of words added by users", sorted_result.keys(), sorted_result.values(), "Users")
+    ]}
+
+
+def top_10_most_searched_data():
+    result = get_top_10_most_searched()
+    if result is False:
+        return None
+
+    sorted_by_content = sorted(result, key=lambda x: x['content'])
+    sorted_by_searched = sorted(result, key=lambda x: x['searched'], reverse=True)
+    return {'plots': [
+        bar_plot_data("Words Sorted Alphabetically by 'content'",
+                      [item['content'] for item in sorted_by_content], [item['searched'] for item in sorted_by_content],
+                      "Content", "Searched", height=400, width=0.5),
+        bar_plot_data("Words Sorted by 'searched' (Descending)",
+                      [item['content'] for item in sorted_by_searched], [item['searched'] for item in sorted_by_searched],
+                      "Content", "Searched", color="green", height=400, width=0.5)
+    ]}
+
+
+def searched_words_per_day_17_data():
+    seventeen_days_ago = datetime.utcnow().date() - timedelta(days=17)
+
+    results_not_sorted = db.session.query(
+        func.date(Word.last_search).label('date'),
+        func.count(Word.id).label('count')
+    ).filter(
+        Word.last_search >= seventeen_days_ago
+    ).group_by(func.date(Word.last_search)).all()
+
+    results_sorted = db.session.query(
+        func.date(Word.last_search).label('date'),
+        func.count(Word.id).label('count')
+    ).filter(
+        Word.last_search != None
+    ).group_by(func.date(Word.last_search)) \
+    .order_by(func.count(Word.id).desc()) \
+    .limit(17).all()
+
+    return {'plots': [
+        bar_plot_data("Liczba wyszukiwań słów każdego dnia (ostatnie 17 dni)",
+                      [result.date for result in results_not_sorted], [result.count for result in results_not_sorted],
+                      "Data", "Liczba wyszukiwań", color="green", width=0.5, label_orientation=0.8, legend="Wyszukiwania"),
+        bar_plot_data("Top 10 dni z największą liczbą wyszukiwań słów",
+                      [result.date for result in results_sorted], [result.count for result in results_sorted],
+                      "Data", "Liczba wyszukiwań", color="blue", width=0.5, label_orientation=0.8, legend="Top dni")
+    ]}
+
+
 @app.route('/word_starting_with')
 @login_required
 def word_starting_with():
     if current_user.role_id != 3:
         try:
             title = request.args.get('title', 'Number of words starting with each letter')
+            return render_template('charts.html', data_url=chart_data_url('word_starting_with'), title=title)
+        except Exception as e:
+            title = 'There was an issue dispaying plot'
+            log_events(flag='ER?', title=title, description=e)
+            return render_template('error_page.html', message=title)
+    else:
+        title = 'permission to see analysis module'
+        log_events(flag='ER!', title=f'No {title}', description=None)
+        return render_template('error_page.html', message=f'You dont have {title}')
 
-            result = get_content_starts_with_count()
-            letters = list(result.keys())
-            values = list(result.values())
-
-            not_sorted_plot = figure(
-                x_range=letters,
-                height=500,
-                sizing_mode="stretch_width",
-                title="Number of Words Starting with Each Letter",
-                toolbar_location=None, tools=""
-            )
-            
-            not_sorted_plot.vbar(x=letters, top=values, width=0.8, color="navy", alpha=0.7)
-
-            not_sorted_plot.xgrid.grid_line_color = None
-            not_sorted_plot.y_range.start = 0
-            not_sorted_plot.xaxis.axis_label = "Letters"
-            not_sorted_plot.yaxis.axis_label = "Count"
-            not_sorted_plot.xaxis.major_label_orientation = "horizontal"
-        
-            script, div = components(not_sorted_plot)
-            p_not_sorted = [script, div]
 
-            sorted_result = dict(sorted(result.items(), key=lambda x:x[1]))
+@app.route('/letter_position_frequency')
+@login_required
+def letter_position_frequency():
+    if current_user.role_id != 3:
+        try:
+            title = request.args.get('title', 'Frequency of letters on each position')
+            return render_template('charts.html', data_url=chart_data_url('letter_position_frequency'), title=title)
+        except Exception as e:
+            title = 'There was an issue dispaying plot'
+            log_events(flag='ER?', title=title, description=e)
+            return render_template('error_page.html', message=title)
+    else:
+        title = 'permission to see analysis module'
+        log_events(flag='ER!', title=f'No {title}', description=None)
+        return render_template('error_page.html', message=f'You dont have {title}')
 
-            sorted_letters = list(sorted_result.keys())
-            sorted_values = list(sorted_result.values())
 
-            sorted_plot = figure(
-                x_range=sorted_letters,
-                height=500,
-                sizing_mode="stretch_width",
-                title="Number of Words Starting with Each Letter",
-                toolbar_location=None, tools=""
-            )
-            
-            sorted_plot.vbar(x=sorted_letters, top=sorted_values, width=0.8, color="navy", alpha=0.7)
+@app.route('/bigram_frequency')
+@login_required
+def bigram_frequency():
+    if current_user.role_id != 3:
+        try:
+            title = request.args.get('title', 'Frequency of letter pairs')
+            return render_template('charts.html', data_url=chart_data_url('bigram_frequency'), title=title)
+        except Exception as e:
+            title = 'There was an issue dispaying plot'
+            log_events(flag='ER?', title=title, description=e)
+            return render_template('error_page.html', message=title)
+    else:
+        title = 'permission to see analysis module'
+        log_events(flag='ER!', title=f'No {title}', description=None)
+        return render_template('error_page.html', message=f'You dont have {title}')
 
-            sorted_plot.xgrid.grid_line_color = None
-            sorted_plot.y_range.start = 0
-            sorted_plot.xaxis.axis_label = "Letters"
-            sorted_plot.yaxis.axis_label = "Count"
-            sorted_plot.xaxis.major_label_orientation = "horizontal"
-        
-            script, div = components(sorted_plot)
-            p_sorted = [script, div]
 
-            return render_template('charts.html', p_not_sorted=p_not_sorted, p_sorted=p_sorted, title=title)
+@app.route('/diacritics_distribution')
+@login_required
+def diacritics_distribution():
+    if current_user.role_id != 3:
+        try:
+            title = request.args.get('title', 'Polish diacritics in words')
+            return render_template('charts.html', data_url=chart_data_url('diacritics_distribution'), title=title)
         except Exception as e:
             title = 'There was an issue dispaying plot'
             log_events(flag='ER?', title=title, description=e)
@@ -1325,55 +1969,7 @@ def unique_added_by_count():
     if current_user.role_id != 3:
         try:
             title = request.args.get('title', 'Number of words added by users')
-
-            result = get_unique_added_by_count()
-            users = list(result.keys())
-            values = list(result.values())
-
-            not_sorted_plot = figure(
-                x_range=users,
-                height=500,
-                sizing_mode="stretch_width",
-                title="Number of words added by users",
-                toolbar_location=None, tools=""
-            )
-            
-            not_sorted_plot.vbar(x=users, top=values, width=0.8, color="navy", alpha=0.7)
-
-            not_sorted_plot.xgrid.grid_line_color = None
-            not_sorted_plot.y_range.start = 0
-            not_sorted_plot.xaxis.axis_label = "Users"
-            not_sorted_plot.yaxis.axis_label = "Count"
-            not_sorted_plot.xaxis.major_label_orientation = "horizontal"
-        
-            script, div = components(not_sorted_plot)
-            p_not_sorted = [script, div]
-
-            sorted_result = dict(sorted(result.items(), key=lambda x:x[1]))
-
-            sorted_users = list(sorted_result.keys())
-            sorted_values = list(sorted_result.values())
-
-            sorted_plot = figure(
-                x_range=sorted_users,
-                height=500,
-                sizing_mode="stretch_width",
-                title="Number of words added by users",
-                toolbar_location=None, tools=""
-            )
-            
-            sorted_plot.vbar(x=sorted_users, top=sorted_values, width=0.8, color="navy", alpha=0.7)
-
-            sorted_plot.xgrid.grid_line_color = None
-            sorted_plot.y_range.start = 0
-            sorted_plot.xaxis.axis_label = "Users"
-            sorted_plot.yaxis.axis_label = "Count"
-            sorted_plot.xaxis.major_label_orientation = "horizontal"
-        
-            script, div = components(sorted_plot)
-            p_sorted = [script, div]
-
-            return render_template('charts.html', p_not_sorted=p_not_sorted, p_sorted=p_sorted,title=title)
+            return render_template('charts.html', data_url=chart_data_url('unique_added_by_count'), title=title)
         except Exception as e:
             title = 'There was an issue dispaying plot'
             log_events(flag='ER?', title=title, description=e)
@@ -1390,38 +1986,7 @@ def top_10_most_searched():
     if current_user.role_id != 3:
         try:
             title = request.args.get('title', 'Top 10 most searched words')
-
-            result = get_top_10_most_searched()
-            if result is False:
-                return render_template('error_page.html', message="No words have been searched yet.")
-
-            sorted_by_content = sorted(result, key=lambda x: x['content'])
-            content_x = [item['content'] for item in sorted_by_content]
-            searched_y = [item['searched'] for item in sorted_by_content]
-
-            p1 = figure(x_range=content_x, title="Words Sorted Alphabetically by 'content'", height=400, sizing_mode="stretch_width")
-            p1.vbar(x=content_x, top=searched_y, width=0.5, color="navy", alpha=0.7)
-            p1.xaxis.major_label_orientation = "horizontal"
-            p1.xaxis.axis_label = "Content"
-            p1.yaxis.axis_label = "Searched"
-
-            sorted_by_searched = sorted(result, key=lambda x: x['searched'], reverse=True)
-            content_x_sorted = [item['content'] for item in sorted_by_searched]
-            searched_y_sorted = [item['searched'] for item in sorted_by_searched]
-
-            p2 = figure(x_range=content_x_sorted, title="Words Sorted by 'searched' (Descending)", height=400, sizing_mode="stretch_width")
-            p2.vbar(x=content_x_sorted, top=searched_y_sorted, width=0.5, color="green", alpha=0.7)
-            p2.xaxis.major_label_orientation = "horizontal"
-            p2.xaxis.axis_label = "Content"
-            p2.yaxis.axis_label = "Searched"
-
-            script1, div1 = components(p1)
-            script2, div2 = components(p2)
-
-            p_not_sorted = [script1, div1]
-            p_sorted = [script2, div2]
-
-            return render_template('charts.html', p_not_sorted=p_not_sorted, p_sorted=p_sorted, title=title)
+            return render_template('charts.html', data_url=chart_data_url('top_10_most_searched'), title=title)
         except Exception as e:
             title = 'There was an issue dispaying plot'
             log_events(flag='ER?', title=title, description=e)
@@ -1432,78 +1997,13 @@ def top_10_most_searched():
         return render_template('error_page.html', message=f'You dont have {title}')
 
 
-
 @app.route('/searched_words_per_day_17', methods=['GET'])
 @login_required
 def searched_words_per_day_17():
     if current_user.role_id != 3:
         try:
             title = request.args.get('title', 'Searched words per day, last 17 days')
-
-            seventeen_days_ago = datetime.utcnow().date() - timedelta(days=17)
-
-            results_not_sorted = db.session.query(
-                func.date(Word.last_search).label('date'),
-                func.count(Word.id).label('count')
-            ).filter(
-                Word.last_search >= seventeen_days_ago
-            ).group_by(func.date(Word.last_search)).all()
-            
-            dates_not_sorted = [str(result.date) for result in results_not_sorted]
-            counts_not_sorted = [result.count for result in results_not_sorted]
-
-            p_not_sorted = figure(
-                x_range=dates_not_sorted,
-                title="Liczba wyszukiwań słów każdego dnia (ostatnie 17 dni)",
-                x_axis_label="Data",
-                y_axis_label="Liczba wyszukiwań",
-                height=500,
-                width=1000,
-                sizing_mode="stretch_width"
-            )
-
-            p_not_sorted.vbar(x=dates_not_sorted, top=counts_not_sorted, width=0.5, color="green", legend_label="Wyszukiwania")
-
-            p_not_sorted.xaxis.major_label_orientation = 0.8
-            p_not_sorted.legend.title = "Legenda"
-            p_not_sorted.legend.location = "top_left"
-
-            script_not_sorted, div_not_sorted = components(p_not_sorted)
-
-            results_sorted = db.session.query(
-                func.date(Word.last_search).label('date'),
-                func.count(Word.id).label('count')
-            ).filter(
-                Word.last_search != None
-            ).group_by(func.date(Word.last_search)) \
-            .order_by(func.count(Word.id).desc()) \
-            .limit(17).all()
-
-            dates_sorted = [str(result.date) for result in results_sorted]
-            counts_sorted = [result.count for result in results_sorted]
-
-            p_sorted = figure(
-                x_range=dates_sorted,
-                title="Top 10 dni z największą liczbą wyszukiwań słów",
-                x_axis_label="Data",
-                y_axis_label="Liczba wyszukiwań",
-                height=500,
-                width=1000,
-                sizing_mode="stretch_width"
-            )
-
-            p_sorted.vbar(x=dates_sorted, top=counts_sorted, width=0.5, color="blue", legend_label="Top dni")
-
-            p_sorted.xaxis.major_label_orientation = 0.8
-            p_sorted.legend.title = "Legenda"
-            p_sorted.legend.location = "top_left"
-
-            script_sorted, div_sorted = components(p_sorted)
-
-            p_not_sorted = [script_not_sorted, div_not_sorted]
-            p_sorted = [script_sorted, div_sorted]
-
-            return render_template('charts.html', p_not_sorted=p_not_sorted, p_sorted=p_sorted, title=title)
+            return render_template('charts.html', data_url=chart_data_url('searched_words_per_day_17'), title=title)
         except Exception as e:
             title = 'There was an issue dispaying plot'
             log_events(flag='ER?', title=title, description=e)
@@ -1514,6 +2014,49 @@ def searched_words_per_day_17():
         return render_template('error_page.html', message=f'You dont have {title}')
 
 
+# data of every chart: function making it, tables it is made from (for chart_cache), if only admin can see it
+# and message shown when there is nothing to draw (function returned None)
+CHARTS = {
+    'word_starting_with': (word_starting_with_data, ['word'], False, None),
+    'letter_position_frequency': (letter_position_frequency_data, ['word'], False, None),
+    'bigram_frequency': (bigram_frequency_data, ['word'], False, None),
+    'diacritics_distribution': (diacritics_distribution_data, ['word'], False, None),
+    'unique_added_by_count': (unique_added_by_count_data, ['word'], False, None),
+    'top_10_most_searched': (top_10_most_searched_data, ['word'], False, "No words have been searched yet."),
+    'searched_words_per_day_17': (searched_words_per_day_17_data, ['word'], False, None),
+    'events_per_user': (events_per_user_data, ['history'], True, "No events found for any user."),
+    'events_per_flag': (events_per_flag_data, ['history'], True, "No events found for any flag."),
+    'er_flags': (er_flags_data, ['history'], True, "No events found with the specified flags."),
+    'cr_flags': (cr_flags_data, ['history'], True, "No events found with the specified flags."),
+    'edits_by_type': (edits_by_type_data, ['history'], True, "No events found with the specified flags."),
+}
+# charts counted from today's date (e.g. last 17 days), cached separately for every day
+DATE_RELATIVE_CHARTS = {'searched_words_per_day_17'}
+
+
+@app.route('/api/charts/<string:name>', methods=['GET'])
+@login_required
+def chart_data(name):
+    if name not in CHARTS:
+        return jsonify({"error": f"There is no chart {name}"}), 404
+    make_data, tables, admin_only, empty_message = CHARTS[name]
+    if (admin_only and current_user.role_id != 1) or current_user.role_id == 3:
+        title = 'permission to see analysis module'
+        log_events(flag='ER!', title=f'No {title}', description=None)
+        return jsonify({"error": f"You dont have {title}"}), 403
+    try:
+        data = chart_cache.get_or_build(chart_cache_key(name in DATE_RELATIVE_CHARTS), make_data, tables)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        title = 'There was an issue getting chart data'
+        log_events(flag='ER?', title=title, description=e)
+        return jsonify({"error": title}), 500
+    if data is None:
+        return jsonify({"error": empty_message}), 404
+    return jsonify(data), 200
+
+
 # BUBBLES
 
 
@@ -1602,4 +2145,7 @@ def top_10_latest_searched():
 
 
 if __name__ == "__main__":
+    with app.app_context():
+        prepare_database()
+        get_word_index()
     app.run('0.0.0.0', port=80, debug=True)
\ No newline at end of file
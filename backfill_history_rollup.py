@@ -0,0 +1,24 @@
+# counts all History events again into history_daily_rollup table
+# run once after upgrading existing database, or when rollup looks wrong
+
+from app import app, db, rebuild_history_rollup
+import time
+
+
+def decorator(func):
+    def inner1(*args, **kwargs):
+        print("\n*** Running " + func.__name__ + " ***")
+        func(*args, **kwargs)
+    return inner1
+
+
+@decorator
+def backfill_history_rollup():
+    with app.app_context():
+        begin = time.time()
+        db.create_all()
+        rows = rebuild_history_rollup()
+        print(f"Rollup rows written: {rows}")
+        print("Total time taken: ", time.time() - begin)
+
+backfill_history_rollup()
@@ -0,0 +1,115 @@
+# concurrent read / write throughput of sqlite database with and without pragmas from database_config.py
+# every worker is a separate process with its own engine (like app workers), readers look up words by id
+# and read top searched words, writers do what app does on every search: searched += 1 and one History insert
+# database is a temporary copy made for benchmark, instance/words.db is not touched
+# usage: python benchmark_database.py [--words N] [--readers N] [--writers N] [--seconds S] [--mode baseline|tuned|both]
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from random import randint
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from database_config import engine_options, install_sqlite_pragmas, sqlite_pragmas, env_int
+
+# rollback journal and full sync, what sqlite does with bare sqlite:/// url
+BASELINE_PRAGMAS = [
+    'PRAGMA journal_mode=DELETE',
+    'PRAGMA synchronous=FULL',
+    f"PRAGMA busy_timeout={env_int('SQLITE_BUSY_TIMEOUT', 5000)}",
+]
+
+
+def create_database(path, words):
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE TABLE word (id INTEGER PRIMARY KEY, content VARCHAR(5) UNIQUE, searched INTEGER, last_search DATETIME)')
+        connection.exec_driver_sql('CREATE TABLE history (id INTEGER PRIMARY KEY, flag VARCHAR(3), title VARCHAR(200), user VARCHAR(50), date DATETIME)')
+        connection.execute(text('INSERT INTO word (content, searched) VALUES (:content, 0)'),
+                           [{'content': f'w{i:07d}'} for i in range(words)])
+    engine.dispose()
+
+
+def make_engine(path, pragmas):
+    url = f'sqlite:///{path}'
+    engine = create_engine(url, **engine_options(url))
+    install_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
+def reader(args):
+    path, pragmas, words, start, seconds = args
+    engine = make_engine(path, pragmas)
+    done = errors = 0
+    while time.time() < start:
+        time.sleep(0.001)
+    with engine.connect() as connection:
+        while time.time() < start + seconds:
+            try:
+                connection.execute(text('SELECT content, searched FROM word WHERE id = :id'), {'id': randint(1, words)}).fetchone()
+                connection.execute(text('SELECT content FROM word ORDER BY searched DESC LIMIT 10')).fetchall()
+                connection.rollback()
+                done += 1
+            except OperationalError:
+                connection.rollback()
+                errors += 1
+    engine.dispose()
+    return 'read', done, errors
+
+
+def writer(args):
+    path, pragmas, words, start, seconds = args
+    engine = make_engine(path, pragmas)
+    done = errors = 0
+    while time.time() < start:
+        time.sleep(0.001)
+    with engine.connect() as connection:
+        while time.time() < start + seconds:
+            try:
+                with connection.begin():
+                    connection.execute(text('UPDATE word SET searched = searched + 1, last_search = :now WHERE id = :id'),
+                                       {'id': randint(1, words), 'now': datetime.now()})
+                    connection.execute(text('INSERT INTO history (flag, title, user, date) VALUES (:flag, :title, :user, :now)'),
+                                       {'flag': 'SRW', 'title': 'benchmark', 'user': 'benchmark', 'now': datetime.now()})
+                done += 1
+            except OperationalError:
+                errors += 1
+    engine.dispose()
+    return 'write', done, errors
+
+
+def run(name, pragmas, words, readers, writers, seconds):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.db')
+        create_database(path, words)
+        start = time.time() + 1.0
+        jobs = [(path, pragmas, words, start, seconds)]
+        totals = {'read': [0, 0], 'write': [0, 0]}
+        with ProcessPoolExecutor(max_workers=readers + writers) as executor:
+            futures = [executor.submit(reader, *jobs) for _ in range(readers)] + [executor.submit(writer, *jobs) for _ in range(writers)]
+            for future in futures:
+                kind, done, errors = future.result()
+                totals[kind][0] += done
+                totals[kind][1] += errors
+    print(f"{name:>8}: {totals['read'][0] / seconds:10.0f} reads/s  {totals['write'][0] / seconds:8.0f} writes/s  "
+          f"errors: {totals['read'][1]} read, {totals['write'][1]} write")
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark concurrent reads and writes of sqlite database')
+    parser.add_argument('--words', type=int, default=30000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--mode', choices=['baseline', 'tuned', 'both'], default='both')
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.words} words, {args.seconds}s")
+    if args.mode in ('baseline', 'both'):
+        run('baseline', BASELINE_PRAGMAS, args.words, args.readers, args.writers, args.seconds)
+    if args.mode in ('tuned', 'both'):
+        run('tuned', sqlite_pragmas(), args.words, args.readers, args.writers, args.seconds)
@@ -0,0 +1,70 @@
+# cache of analysis chart data (payloads of /api/charts/<name>, drawn in browser by static/js/charts.js)
+# entries are kept per key (route and its query args) together with data version they were made from,
+# every table has its own version (bumped after every write to it), entry made from some tables
+# is returned only while versions of all of them are unchanged
+# versions are counted only in this process, writes of other workers and scripts (words_import.py) are seen through
+# shared_version(tables) - signature of tables read from database (e.g. row count and last id), part of entry version
+# least recently used entries are removed when there is more than max_size of them
+
+from collections import OrderedDict
+import threading
+
+
+class ChartCache:
+    def __init__(self, max_size=128, shared_version=None):
+        self.max_size = max_size
+        self.shared_version = shared_version
+        self.entries = OrderedDict()  # key -> (version, value)
+        self.lock = threading.Lock()
+        self.versions = {}  # table name -> version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bump(self, table):
+        with self.lock:
+            self.versions[table] = self.versions.get(table, 0) + 1
+
+    # value made by build() from given tables, build() runs outside of the lock
+    # value is not saved if data changed while it was built
+    def get_or_build(self, key, build, tables):
+        shared = self.shared_version(tables) if self.shared_version else None
+        with self.lock:
+            version = (self.version(tables), shared)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = build()
+
+        with self.lock:
+            if self.version(tables) == version[0]:
+                self.entries[key] = (version, value)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def version(self, tables):
+        return tuple(self.versions.get(table, 0) for table in tables)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'versions': dict(self.versions),
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / requests, 3) if requests else None
+            }
@@ -0,0 +1,95 @@
+# prints EXPLAIN QUERY PLAN of the most used queries of app (sqlite only)
+# queries are run through the same functions app uses, plan of every statement is taken just before it runs
+# "SCAN <table>" without index means the whole table is read, "USE TEMP B-TREE FOR ORDER BY" means all matching rows
+# are sorted before LIMIT is applied (not reported for GROUP BY, there only groups are sorted), such queries are listed at the end
+# database is upgraded first (prepare_database creates missing indexes)
+
+from app import app, db, Word, Proposal, prepare_database, day_range, get_latest, get_top_10_most_searched, \
+    get_unique_added_by_count, get_history_page, pick_random_unused_word, searched_words_per_day_17_data, POLAND_TZ
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import event
+
+
+def decorator(func):
+    def inner1(*args, **kwargs):
+        print("\n*** Running " + func.__name__ + " ***")
+        func(*args, **kwargs)
+    return inner1
+
+
+@contextmanager
+def capture_plans(engine, plans):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            plan = cursor.connection.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+            plans.append((statement, [row[3] for row in plan]))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield plans
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def word_of_literally_today():
+    day_start, day_end = day_range(datetime.now(POLAND_TZ).date())
+    return Word.query.filter(Word.last_as_word_of_literally >= day_start, Word.last_as_word_of_literally < day_end).first()
+
+
+QUERIES = {
+    'latest words of the day': lambda: get_latest('LWD'),
+    'latest words of literally': lambda: get_latest('LWL'),
+    'latest searched': lambda: get_latest('LS'),
+    'top 10 most searched': get_top_10_most_searched,
+    'words added by users': get_unique_added_by_count,
+    'searched words per day': searched_words_per_day_17_data,
+    'word of literally today': word_of_literally_today,
+    'random unused word': pick_random_unused_word,
+    'history page': lambda: get_history_page(),
+    'history page of flag': lambda: get_history_page(flags=['ER?']),
+    'history page of flags': lambda: get_history_page(flags=['ER?', 'ER!']),
+    'history page of user': lambda: get_history_page(user='admin'),
+    'next history page of flag': lambda: get_history_page(flags=['SRC'], before_date=datetime.now(), before_id=2 ** 31),
+    'proposals by date': lambda: Proposal.query.order_by(Proposal.date).all(),
+}
+
+
+def is_full_scan(detail):
+    return detail.startswith('SCAN ') and ' USING ' not in detail
+
+
+def is_sort(statement, detail):
+    return detail.startswith('USE TEMP B-TREE FOR ORDER BY') and 'GROUP BY' not in statement
+
+
+@decorator
+def check_query_plans():
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            print("EXPLAIN QUERY PLAN works only with sqlite database")
+            return
+        prepare_database()
+        full_scans = []
+        sorts = []
+        for name, query in QUERIES.items():
+            plans = []
+            with capture_plans(db.engine, plans):
+                query()
+            print(f"\n{name}")
+            for statement, details in plans:
+                print("  " + " ".join(statement.split())[:150])
+                for detail in details:
+                    print("    " + detail)
+                    if is_full_scan(detail):
+                        full_scans.append((name, detail))
+                    if is_sort(statement, detail):
+                        sorts.append((name, detail))
+        print("\nFull table scans:" if full_scans else "\nNo full table scans")
+        for name, detail in full_scans:
+            print(f"  {name}: {detail}")
+        print("\nSorts of all matching rows:" if sorts else "\nNo sorts of all matching rows")
+        for name, detail in sorts:
+            print(f"  {name}: {detail}")
+
+check_query_plans()
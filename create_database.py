@@ -1,5 +1,6 @@
 from app import app
-from app import db, User, Word, Role, Flags, NotificationToUser, Notifications, bcrypt
+from app import db, User, Role, Flags, NotificationToUser, Notifications, bcrypt
+from words_import import import_words
 import os
 import time
 import math
@@ -67,14 +68,7 @@ def create_database(database_name=NAME):
 @decorator
 def add_words():
     try:
-        with app.app_context():
-            session = db.session
-            with open(f'{DIR_PATH}\\{WORDS_FILE}', "r", encoding='utf-8', newline='\n') as file:
-                for i in file:
-                    slowo, _ = i.split('\r')
-                    word = Word(content=slowo, searched=0, source='Default from dictionary', added_by='Admin')
-                    session.add(word)
-            session.commit()
+        import_words(os.path.join(DIR_PATH, WORDS_FILE))
         return True
     except Exception as e:
         logging.error(traceback.format_exc())
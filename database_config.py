@@ -0,0 +1,96 @@
+# database settings of the app, read from environment so they can be changed without editing code
+#   DATABASE_URL          - SQLAlchemy URL, default sqlite:///words.db (relative sqlite path is in instance/ folder)
+#   DB_WORKER_THREADS     - threads serving requests in one worker process, pool keeps that many connections
+#   DB_POOL_SIZE          - connections kept in pool of every worker (default DB_WORKER_THREADS)
+#   DB_MAX_OVERFLOW       - extra connections opened when pool is busy
+#   DB_POOL_TIMEOUT       - seconds to wait for free connection
+#   DB_POOL_RECYCLE       - seconds after which server connection is opened again (not sqlite)
+#   DB_TIMEZONE           - session time zone of PostgreSQL, app writes Polish time and sqlite keeps it as it is
+#   SQLITE_TUNING         - 0 turns off all pragmas below (plain rollback journal, as sqlite defaults)
+#   SQLITE_JOURNAL_MODE   - WAL: readers do not wait for writer and writer does not wait for readers
+#   SQLITE_SYNCHRONOUS    - NORMAL: in WAL mode database stays consistent, only last commits can be lost on power cut
+#   SQLITE_BUSY_TIMEOUT   - milliseconds connection waits for lock instead of failing with "database is locked"
+#   SQLITE_MMAP_SIZE      - bytes of database file read through memory map
+#   SQLITE_CACHE_SIZE     - page cache of every connection, negative value is size in KiB
+# pragmas are run on every new connection (journal_mode is kept in database file, the rest is per connection)
+
+import os
+from sqlalchemy import event
+
+DEFAULT_DATABASE_URL = 'sqlite:///words.db'
+# values sqlite uses when nothing is set, used to undo temporary pragmas (e.g. of bulk import)
+SQLITE_DEFAULT_PRAGMAS = [
+    'PRAGMA synchronous=FULL',
+    'PRAGMA cache_size=-2000',
+    'PRAGMA temp_store=DEFAULT',
+]
+
+
+def env_int(name, default):
+    value = os.environ.get(name, '').strip()
+    return int(value) if value else default
+
+
+def env_flag(name, default=True):
+    value = os.environ.get(name, '').strip().lower()
+    return default if not value else value not in ('0', 'false', 'no', 'off')
+
+
+def database_url():
+    return os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+
+
+def is_sqlite(url):
+    return url.startswith('sqlite')
+
+
+def sqlite_pragmas():
+    if not env_flag('SQLITE_TUNING'):
+        return []
+    return [
+        f"PRAGMA journal_mode={os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')}",
+        f"PRAGMA synchronous={os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA busy_timeout={env_int('SQLITE_BUSY_TIMEOUT', 5000)}",
+        f"PRAGMA mmap_size={env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}",
+        f"PRAGMA cache_size={env_int('SQLITE_CACHE_SIZE', -64 * 1024)}",
+    ]
+
+
+# options for create_engine (SQLALCHEMY_ENGINE_OPTIONS)
+# pool is sized for one worker process: every thread of worker can hold a connection at the same time
+def engine_options(url=None):
+    url = url or database_url()
+    threads = env_int('DB_WORKER_THREADS', 8)
+    options = {
+        'pool_size': env_int('DB_POOL_SIZE', threads),
+        'max_overflow': env_int('DB_MAX_OVERFLOW', threads),
+        'pool_timeout': env_int('DB_POOL_TIMEOUT', 30),
+    }
+    if is_sqlite(url):
+        # busy timeout is also given to driver, so it is used before pragmas run
+        options['connect_args'] = {
+            'timeout': env_int('SQLITE_BUSY_TIMEOUT', 5000) / 1000 if env_flag('SQLITE_TUNING') else 5,
+            'check_same_thread': False,
+        }
+        if ':memory:' in url or url in ('sqlite://', 'sqlite:///'):
+            options = {'connect_args': {'check_same_thread': False}}
+    else:
+        options['pool_pre_ping'] = True
+        options['pool_recycle'] = env_int('DB_POOL_RECYCLE', 1800)
+    if url.startswith('postgresql'):
+        options['connect_args'] = {'options': f"-c timezone={os.environ.get('DB_TIMEZONE', 'Europe/Warsaw')}"}
+    return options
+
+
+# run pragmas on every new connection of sqlite engine
+def install_sqlite_pragmas(engine, pragmas=None):
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
@@ -0,0 +1,106 @@
+# in-process sink for History events
+# events are put on a bounded queue and a background thread writes them in batches,
+# batch is written when it reaches batch_size or when flush_interval seconds passed
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 2.0
+MAX_QUEUE_SIZE = 10000
+
+
+class EventWriter:
+    # write_batch - function getting list of event dicts and saving them all at once
+    def __init__(self, write_batch, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, max_queue_size=MAX_QUEUE_SIZE):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopping = threading.Event()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+    # start background thread on first event, so importing app does not spawn threads
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.stopping.clear()
+                self.thread = threading.Thread(target=self.run, name='event-writer', daemon=True)
+                self.thread.start()
+                atexit.register(self.stop)
+
+    # never blocks the request, when queue is full event is dropped and counted
+    def put(self, event):
+        if self.thread is None:
+            self.start()
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+
+    def run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while not (self.stopping.is_set() and self.queue.empty()):
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self.write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+        self.write(batch)
+
+    def write(self, batch):
+        if not batch:
+            return
+        try:
+            self.write_batch(batch)
+            with self.lock:
+                self.written += len(batch)
+        except Exception:
+            logging.exception('Failed to write batch of %d events', len(batch))
+            with self.lock:
+                self.failed += len(batch)
+
+    # write everything what is left in queue and stop thread
+    def stop(self, timeout=10):
+        thread = self.thread
+        if thread is None:
+            return
+        self.stopping.set()
+        thread.join(timeout)
+        self.thread = None
+
+    # write all queued events now, used by synchronous callers (scripts, shutdown)
+    def flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch = []
+        self.write(batch)
@@ -0,0 +1,201 @@
+# feedback pattern matrix for the word finder
+# matrix[g, a] is feedback (like in wordle) which guess g gets when answer is a, coded as number 0..242:
+# every position gives 0 - letter not in word, 1 - letter in word on other place, 2 - letter on its place,
+# pattern = sum(feedback[i] * 3**i)
+# with matrix ready, best next guess is the one splitting remaining candidates into most even groups (highest entropy)
+# matrix is built offline into a raw uint8 file (row g = guess g, column a = answer a, words in order of words file)
+# and opened with numpy.memmap, so all worker processes share the same pages and nothing is computed at startup
+# file starts with HEADER_SIZE bytes header: MAGIC, number of words and sha256 of word list it was built from,
+# so matrix is never used with word list of other build (files are replaced one after another)
+# build: python feedback_matrix.py [word file] [--processes N]
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import os
+import time
+import numpy as np
+from word_index import read_words_file, WORD_LENGTH
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+WORDS_FILE = 'slowa_piecioliterowe.txt'
+MATRIX_FILE = os.path.join(DIR_PATH, 'instance', 'feedback_matrix.bin')
+MATRIX_WORDS_FILE = os.path.join(DIR_PATH, 'instance', 'feedback_words.txt')
+PATTERNS = 3 ** WORD_LENGTH
+BLOCK_SIZE = 256
+MAX_CANDIDATES = 1000
+POWERS = 3 ** np.arange(WORD_LENGTH, dtype=np.uint8)
+MAGIC = b'FBMX0001'
+HEADER_SIZE = 64
+
+
+# words as (n, word_length) array of letter codes
+def encode_words(words, word_length=WORD_LENGTH):
+    letters = {letter: i for i, letter in enumerate(sorted(set(''.join(words))))}
+    codes = np.empty((len(words), word_length), dtype=np.uint8)
+    for i, word in enumerate(words):
+        codes[i] = [letters[letter] for letter in word]
+    return codes
+
+
+# patterns of every guess in guesses against every answer in answers, (len(guesses), len(answers)) uint8
+def feedback_patterns(guesses, answers):
+    green = guesses[:, None, :] == answers[None, :, :]
+    yellow = np.zeros_like(green)
+    length = guesses.shape[1]
+    for i in range(length):
+        letter = guesses[:, i][:, None]
+        # how many of this letter answer has on places which are not green
+        available = np.zeros(green.shape[:2], dtype=np.uint8)
+        for j in range(length):
+            available += (answers[None, :, j] == letter) & ~green[:, :, j]
+        # same letter earlier in guess, already marked as yellow, uses one of them
+        used = np.zeros_like(available)
+        for k in range(i):
+            used += (guesses[:, k] == guesses[:, i])[:, None] & yellow[:, :, k]
+        yellow[:, :, i] = ~green[:, :, i] & (available > used)
+    feedback = green.astype(np.uint8) * 2 + yellow
+    return (feedback * POWERS).sum(axis=2, dtype=np.uint8)
+
+
+# output - array (n, n) to fill, e.g. numpy.memmap of matrix file; new array in memory if None
+def build_matrix(words, output=None, block_size=BLOCK_SIZE, progress=print):
+    codes = encode_words(words)
+    matrix = np.empty((len(words), len(words)), dtype=np.uint8) if output is None else output
+    begin = time.time()
+    for start in range(0, len(words), block_size):
+        matrix[start:start + block_size] = feedback_patterns(codes[start:start + block_size], codes)
+        if progress:
+            progress(f"{min(start + block_size, len(words))} / {len(words)} guesses, {time.time() - begin:.1f}s")
+    return matrix
+
+
+def words_digest(words):
+    return hashlib.sha256('\n'.join(words).encode('utf-8')).digest()
+
+
+def matrix_header(words):
+    return (MAGIC + len(words).to_bytes(8, 'little') + words_digest(words)).ljust(HEADER_SIZE, b'\0')
+
+
+# rows start:end of matrix file, computed in a worker process and written through its own memmap
+def build_shard(args):
+    matrix_file, codes, start, end, block_size = args
+    begin = time.time()
+    n = len(codes)
+    output = np.memmap(matrix_file, dtype=np.uint8, mode='r+', shape=(end - start, n), offset=HEADER_SIZE + start * n)
+    for block in range(start, end, block_size):
+        stop = min(block + block_size, end)
+        output[block - start:stop - start] = feedback_patterns(codes[block:stop], codes)
+    output.flush()
+    del output
+    return start, end, time.time() - begin
+
+
+# guesses are cut into shards (a few per process, so fast processes take more of them),
+# every shard is written by its worker directly to matrix file, nothing is sent back except timing
+def build_matrix_parallel(words, output, processes=None, block_size=BLOCK_SIZE, progress=print):
+    processes = processes or os.cpu_count() or 1
+    codes = encode_words(words)
+    output.flush()
+    shard_size = max(block_size, -(-len(words) // (processes * 4)))
+    jobs = [(output.filename, codes, start, min(start + shard_size, len(words)), block_size)
+            for start in range(0, len(words), shard_size)]
+    begin = time.time()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for done, (start, end, seconds) in enumerate(executor.map(build_shard, jobs), 1):
+            if progress:
+                progress(f"shard {done}/{len(jobs)}: guesses {start}-{end} in {seconds:.1f}s ({(end - start) / seconds:.0f} rows/s), {time.time() - begin:.1f}s total")
+    return output
+
+
+def save_words(words, words_file=MATRIX_WORDS_FILE):
+    with open(words_file, 'w', encoding='utf-8') as f:
+        for word in words:
+            f.write(word + '\n')
+
+
+# matrix is written straight to memmap of a temporary file, which then replaces old files (word list first),
+# processes which have old matrix opened keep using it until they see new files (app compares inode and mtime),
+# between the two replaces header of matrix does not match word list and old matrix is still used
+# processes > 1 builds it with build_matrix_parallel
+def build_matrix_file(words, matrix_file=MATRIX_FILE, words_file=MATRIX_WORDS_FILE, processes=1, progress=print):
+    os.makedirs(os.path.dirname(matrix_file), exist_ok=True)
+    temporary_matrix = matrix_file + '.tmp'
+    temporary_words = words_file + '.tmp'
+    output = np.memmap(temporary_matrix, dtype=np.uint8, mode='w+', shape=(len(words), len(words)), offset=HEADER_SIZE)
+    if processes > 1:
+        build_matrix_parallel(words, output, processes=processes, progress=progress)
+    else:
+        build_matrix(words, output=output, progress=progress)
+    output.flush()
+    del output
+    with open(temporary_matrix, 'r+b') as f:
+        f.write(matrix_header(words))
+    save_words(words, temporary_words)
+    os.replace(temporary_words, words_file)
+    os.replace(temporary_matrix, matrix_file)
+
+
+class FeedbackMatrix:
+    def __init__(self, matrix, words):
+        self.matrix = matrix
+        self.words = words
+        self.positions = {word: i for i, word in enumerate(words)}
+
+    # read-only memmap, pages are loaded by system when needed and shared between processes
+    @classmethod
+    def load(cls, matrix_file=MATRIX_FILE, words_file=MATRIX_WORDS_FILE):
+        words = list(read_words_file(words_file, None))
+        with open(matrix_file, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            size = os.fstat(f.fileno()).st_size
+        if header != matrix_header(words):
+            raise ValueError(f'Feedback matrix {matrix_file} was not built from word list {words_file}, build it again')
+        if size != HEADER_SIZE + len(words) * len(words):
+            raise ValueError(f'Feedback matrix of {size} bytes does not match {len(words)} words')
+        matrix = np.memmap(matrix_file, dtype=np.uint8, mode='r', shape=(len(words), len(words)), offset=HEADER_SIZE)
+        return cls(matrix, words)
+
+    # entropy (in bits) of feedback partition of candidates, for every guess
+    def entropies(self, candidates, guesses, block_size=1024):
+        result = np.empty(len(guesses), dtype=np.float64)
+        for start in range(0, len(guesses), block_size):
+            block = guesses[start:start + block_size]
+            patterns = self.matrix[np.ix_(block, candidates)]
+            offsets = np.arange(len(block), dtype=np.int64)[:, None] * PATTERNS
+            counts = np.bincount((patterns + offsets).ravel(), minlength=len(block) * PATTERNS).reshape(len(block), PATTERNS)
+            p = counts / len(candidates)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result[start:start + len(block)] = -np.nansum(p * np.log2(p), axis=1)
+        return result
+
+    # best guesses for list of candidate words, guesses from whole list (hard_mode - only from candidates)
+    # with more than max_candidates candidates entropy is estimated on a random sample of them
+    # candidates missing from word list of matrix (added after it was built) can not be ranked and are left out
+    # returns (list of (word, entropy, is_candidate) best first, number of candidates which were ranked)
+    def rank(self, candidate_words, top=10, hard_mode=False, max_candidates=MAX_CANDIDATES):
+        candidates = np.array(sorted({self.positions[w] for w in candidate_words if w in self.positions}), dtype=np.int64)
+        ranked = len(candidates)
+        if ranked == 0:
+            return [], 0
+        if ranked <= 2:
+            return [(self.words[i], float(ranked - 1), True) for i in candidates[:top]], ranked
+        guesses = candidates if hard_mode else np.arange(len(self.words), dtype=np.int64)
+        is_candidate = np.isin(guesses, candidates)
+        if len(candidates) > max_candidates:
+            candidates = np.sort(np.random.default_rng(0).choice(candidates, max_candidates, replace=False))
+        entropy = self.entropies(candidates, guesses)
+        # on equal entropy prefer words which can be the answer
+        order = np.lexsort((~is_candidate, -entropy))[:top]
+        return [(self.words[guesses[i]], float(entropy[i]), bool(is_candidate[i])) for i in order], ranked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build feedback pattern matrix of word list')
+    parser.add_argument('file', nargs='?', default=os.path.join(DIR_PATH, WORDS_FILE))
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    words = sorted(set(read_words_file(args.file)))
+    build_matrix_file(words, processes=args.processes)
+    print(f'Saved {len(words)} x {len(words)} matrix to {MATRIX_FILE}')
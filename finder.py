@@ -1,79 +1,112 @@
-import os
-
+# word finder - filters list of words with known facts about searched word
+# Constraints are compiled once into one regex, which then checks every word in a single pass
+# used by /found_words (together with WordIndex) and from command line:
+#   python finder.py --starts-with p --exclude s e y u d k i m n b ę ż j t --at l:1 a:2
 
+import argparse
+import os
+import re
+from word_index import read_words_file, WORD_LENGTH
 
 DIR_PATH = os.path.dirname(os.path.realpath(__file__))
 FILE = 'slowa_piecioliterowe.txt'
 
 
-
-# chceck some letters (in form of list) are in given word
-def check(list, word):
-    j = 0
-    for i in list:
-        if i not in word:
-            j += 1
-    if j == len(list):
-        return word
-
-
-
-# we get them from txt file
-all_words = []
-
-with open(f'{DIR_PATH}\\{FILE}', "r", encoding='utf-8', newline='\n') as f:
-    for i in f:
-        slowo, _ = i.split('\r')
-        if 5 == len(slowo):
-            all_words.append(slowo)
-
-
-
-### first filter ###
-slowa_1 = [] # words after first filter
-starts_with = 'p'
-
-for i in all_words:
-    if i.startswith(starts_with):
-        slowa_1.append(i)
-
-
-### second filter ###
-#no_letters = ['a', 'j', 't', 'e', 'ę', 'o', 'd', 'p', 'ą', 'y'] # list of letters that are not in our word
-no_letters = ['s', 'e', 'y', 'u', 'd', 'k', 'i', 'm', 'n', 'b', 'ę', 'ż', 'j', 't']
-slowa_2 = [] # words after second filter
-
-for i in slowa_1:
-    if not check(no_letters, i) == None:
-        slowa_2.append(check(no_letters, i))
-
-
-### third filter ###
-#letters = {'z': [1, 3], 'i': [2, 3, 4]}
-letters = {'l': [1], 'a': [2]}
-slowa_3 = []
-lists = [] # words after third filter
-
-for key, values in letters.items():
-    words_helping = []
-    for i in slowa_2:
-        for v in values:
-            if i[v] == key and i not in words_helping:
-                words_helping.append(i)
-    lists.append(words_helping)
-
-
-words = lists[0]
-for i in lists[1:]:
-    for j in words:
-        if j not in i:
-            words.remove(j)
-
-# i know this functions are the same, but after one iteration there might be some words not matching conditions
-# but after second iteration we gat what we should expect
-for i in lists[1:]:
-    for j in words:
-        if j not in i:
-            words.remove(j)
-
-print(words)
\ No newline at end of file
+class Constraints:
+    # starts_with - beginning of word
+    # excluded - letters (or longer fragments) that are not in word
+    # included - letters (or longer fragments) that are in word
+    # positions - letter for every position, '' or '-' if it is not known
+    # at_position - {letter: [positions]}, letter is on one of these positions (counted from 0)
+    # not_at_position - {letter: [positions]}, letter is in word, but not on any of these positions
+    def __init__(self, starts_with='', excluded=(), included=(), positions=(), at_position=None, not_at_position=None, word_length=WORD_LENGTH):
+        self.excluded = [e.lower() for e in excluded if e]
+        self.included = [i.lower() for i in included if i]
+        self.positions = {p: l.lower() for p, l in enumerate(positions) if l and l != '-'}
+        for p, l in enumerate(starts_with.lower()):
+            self.positions[p] = l
+        self.at_position = {k.lower(): sorted(set(v)) for k, v in (at_position or {}).items() if v}
+        self.not_at_position = {k.lower(): sorted(set(v)) for k, v in (not_at_position or {}).items() if v}
+        self.word_length = word_length
+        self.regex = re.compile(self.pattern())
+
+    # constraints in form used by /found_words: include and exclude lists, letter (or '-' / '') for every position
+    @classmethod
+    def from_filters(cls, include=(), exclude=(), positions=(), word_length=WORD_LENGTH):
+        return cls(excluded=exclude, included=include, positions=positions, word_length=word_length)
+
+    def pattern(self):
+        lookaheads = []
+        for fragment in self.included:
+            lookaheads.append(f'(?=.*{re.escape(fragment)})')
+        for fragment in self.excluded:
+            lookaheads.append(f'(?!.*{re.escape(fragment)})')
+        for letter, positions in self.at_position.items():
+            options = '|'.join(f'.{{{position}}}{re.escape(letter)}' for position in positions)
+            lookaheads.append(f'(?={options})')
+        for letter in self.not_at_position:
+            lookaheads.append(f'(?=.*{re.escape(letter)})')
+
+        known = list(self.positions) + [p for v in self.not_at_position.values() for p in v]
+        length = self.word_length or (max(known) + 1 if known else 0)
+        places = []
+        for position in range(length):
+            if position in self.positions:
+                places.append(re.escape(self.positions[position]))
+            else:
+                banned = sorted(k for k, v in self.not_at_position.items() if position in v)
+                places.append('[^' + ''.join(re.escape(b) for b in banned) + ']' if banned else '.')
+        end = '$' if self.word_length else ''
+        return '^' + ''.join(lookaheads) + ''.join(places) + end
+
+    # parts which WordIndex can not answer with its sets, if False index result is already exact
+    def needs_check(self):
+        return bool(self.at_position or self.not_at_position
+                    or any(len(f) > 1 for f in self.included + self.excluded))
+
+    def match(self, word):
+        return self.regex.match(word) is not None
+
+    def filter(self, words):
+        match = self.regex.match
+        return [word for word in words if match(word)]
+
+
+# word list is read only once per process
+loaded_words = {}
+
+
+def load_words(path=os.path.join(DIR_PATH, FILE), word_length=WORD_LENGTH):
+    key = (path, word_length)
+    if key not in loaded_words:
+        loaded_words[key] = list(read_words_file(path, word_length))
+    return loaded_words[key]
+
+
+# 'l:1' or 'z:1,3' -> ('l', [1]) / ('z', [1, 3])
+def parse_letter_positions(values):
+    result = {}
+    for value in values or []:
+        letter, positions = value.split(':')
+        result.setdefault(letter, []).extend(int(p) for p in positions.split(','))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Find words matching known letters')
+    parser.add_argument('--file', default=os.path.join(DIR_PATH, FILE))
+    parser.add_argument('--starts-with', default='')
+    parser.add_argument('--exclude', nargs='*', default=[], help='letters that are not in word')
+    parser.add_argument('--include', nargs='*', default=[], help='letters that are in word')
+    parser.add_argument('--at', nargs='*', default=[], help="letter:positions, e.g. l:1 or z:1,3 (letter on one of positions)")
+    parser.add_argument('--not-at', nargs='*', default=[], help="letter:positions, letter is in word but not on these positions")
+    args = parser.parse_args()
+
+    constraints = Constraints(
+        starts_with=args.starts_with,
+        excluded=args.exclude,
+        included=args.include,
+        at_position=parse_letter_positions(args.at),
+        not_at_position=parse_letter_positions(args.not_at)
+    )
+    print(constraints.filter(load_words(args.file)))
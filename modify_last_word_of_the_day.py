@@ -1,5 +1,5 @@
-from app import app, db, Word
-from sqlalchemy import func, desc
+from app import app, db, Word, day_range
+from sqlalchemy import desc
 import pytz
 from datetime import datetime, timedelta
 
@@ -19,7 +19,8 @@ def change_last_word_of_the_day():
         print(today)
         past = today - timedelta(days=3)
         print(past)
-        word_today = Word.query.filter(func.date(Word.last_as_word_of_the_day) == datetime.now(POLAND_TZ).date()).all()
+        day_start, day_end = day_range(today)
+        word_today = Word.query.filter(Word.last_as_word_of_the_day >= day_start, Word.last_as_word_of_the_day < day_end).all()
         print(word_today[0].content)
         word_today[0].last_as_word_of_the_day = past
         try:
@@ -0,0 +1,84 @@
+# write-behind buffer for Word.searched and Word.last_search
+# views only add to counters in memory, background thread saves all of them at once every flush_interval seconds
+
+import atexit
+import logging
+import threading
+
+FLUSH_INTERVAL = 5.0
+
+
+class SearchCounter:
+    # write_counts - function getting list of dicts {'id', 'count', 'last_search'} and saving them at once
+    def __init__(self, write_counts, flush_interval=FLUSH_INTERVAL):
+        self.write_counts = write_counts
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.counts = {}  # word id -> [count, last_search]
+        self.thread = None
+        self.stopping = threading.Event()
+        self.failed = 0
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.stopping.clear()
+                self.thread = threading.Thread(target=self.run, name='search-counter', daemon=True)
+                self.thread.start()
+                atexit.register(self.stop)
+
+    # when - time of search, None if last_search should stay as it is
+    def hit(self, word_id, when=None):
+        if self.thread is None:
+            self.start()
+        with self.lock:
+            entry = self.counts.setdefault(word_id, [0, None])
+            self.add(entry, 1, when)
+
+    @staticmethod
+    def add(entry, count, when):
+        entry[0] += count
+        if when is not None and (entry[1] is None or when > entry[1]):
+            entry[1] = when
+
+    # not saved yet (count, last_search) of word, (0, None) if nothing is waiting
+    def pending(self, word_id):
+        with self.lock:
+            entry = self.counts.get(word_id)
+            return (entry[0], entry[1]) if entry else (0, None)
+
+    # forget waiting hits of word, e.g. when admin sets searched by hand
+    def discard(self, word_id):
+        with self.lock:
+            self.counts.pop(word_id, None)
+
+    def run(self):
+        while not self.stopping.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                counts, self.counts = self.counts, {}
+            if not counts:
+                return
+            rows = [{'id': word_id, 'count': count, 'last_search': last_search} for word_id, (count, last_search) in counts.items()]
+            try:
+                self.write_counts(rows)
+            except Exception:
+                logging.exception('Failed to save search counters of %d words', len(rows))
+                # put them back, they will be saved with next flush
+                with self.lock:
+                    self.failed += 1
+                    for word_id, (count, last_search) in counts.items():
+                        self.add(self.counts.setdefault(word_id, [0, None]), count, last_search)
+
+    def stop(self, timeout=10):
+        thread = self.thread
+        if thread is None:
+            return
+        self.stopping.set()
+        thread.join(timeout)
+        self.thread = None
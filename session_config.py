@@ -0,0 +1,90 @@
+# session storage of the app, chosen from environment like database settings (see database_config.py)
+#   SESSION_BACKEND            - where session data is kept:
+#       cookie     - (default) signed cookie of Flask, nothing is written on server, app keeps only a few small values
+#                    in session (username and some flags), so cookie stays far below browser limit of 4 KB
+#       memory     - dictionary in worker process (cachelib SimpleCache), for tests and local runs with one worker
+#       sqlalchemy - table "sessions" in app database, expired rows are deleted by sweeper
+#       redis      - Redis or compatible server at REDIS_URL, expiry is done by server
+#       filesystem - files in flask_session/ folder (old behaviour), expired files are removed when threshold is reached
+#   SESSION_LIFETIME           - seconds server side session is kept after last change (default one day)
+#   SESSION_CLEANUP_N_REQUESTS - sqlalchemy sweeper deletes expired sessions on average once per N requests,
+#                                0 turns it off, then run "flask session_cleanup" from cron
+#   SESSION_FILE_THRESHOLD     - max number of session files, filesystem backend only
+#   REDIS_URL                  - e.g. redis://localhost:6379/0, redis backend only
+#   SECRET_KEY                 - key signing session cookie (and remember cookie of flask-login), when it is not set
+#                                random key is made once and kept in instance/secret_key, all workers on one machine
+#                                read the same file, app on many machines needs the same SECRET_KEY set on all of them
+# cookie of session is not permanent (removed when browser is closed) with every backend
+# anyone knowing the key can sign cookie of any user, so keys which were ever committed to repository are refused
+
+import os
+import secrets
+from datetime import timedelta
+from flask_session import Session
+from database_config import env_int
+
+BACKENDS = ('cookie', 'memory', 'sqlalchemy', 'redis', 'filesystem')
+PUBLIC_SECRET_KEYS = ('this_key',)
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+
+
+def session_backend():
+    backend = os.environ.get('SESSION_BACKEND', 'cookie').strip().lower() or 'cookie'
+    if backend not in BACKENDS:
+        raise ValueError(f"SESSION_BACKEND has to be one of {', '.join(BACKENDS)}, not {backend}")
+    return backend
+
+
+def secret_key(app):
+    key = os.environ.get('SECRET_KEY', '').strip()
+    if key:
+        return key
+    path = os.path.join(app.instance_path, 'secret_key')
+    if not os.path.exists(path):
+        # written to own file and linked, so worker starting at the same time never reads half written key
+        os.makedirs(app.instance_path, exist_ok=True)
+        temporary_path = f'{path}.{os.getpid()}'
+        with open(temporary_path, 'w') as file:
+            file.write(secrets.token_hex(32))
+        try:
+            os.link(temporary_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temporary_path)
+    with open(path) as file:
+        return file.read().strip()
+
+
+def configure_session(app, db):
+    if not app.secret_key or app.secret_key in PUBLIC_SECRET_KEYS:
+        raise RuntimeError('SECRET_KEY is empty or publicly known, anyone could sign session of any user, '
+                           'set SECRET_KEY to a random value or unset it to use instance/secret_key')
+    backend = session_backend()
+    lifetime = env_int('SESSION_LIFETIME', 24 * 60 * 60)
+    app.config['SESSION_PERMANENT'] = False
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(seconds=lifetime)
+    if backend == 'cookie':
+        # default session interface of Flask
+        return backend
+
+    if backend == 'memory':
+        from cachelib import SimpleCache
+        app.config['SESSION_TYPE'] = 'cachelib'
+        app.config['SESSION_CACHELIB'] = SimpleCache(default_timeout=lifetime)
+    elif backend == 'sqlalchemy':
+        app.config['SESSION_TYPE'] = 'sqlalchemy'
+        app.config['SESSION_SQLALCHEMY'] = db
+        app.config['SESSION_CLEANUP_N_REQUESTS'] = env_int('SESSION_CLEANUP_N_REQUESTS', 100) or None
+    elif backend == 'redis':
+        import redis
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+    elif backend == 'filesystem':
+        from cachelib import FileSystemCache
+        app.config['SESSION_TYPE'] = 'cachelib'
+        app.config['SESSION_CACHELIB'] = FileSystemCache(os.path.join(DIR_PATH, 'flask_session'),
+                                                         threshold=env_int('SESSION_FILE_THRESHOLD', 500),
+                                                         default_timeout=lifetime)
+    Session(app)
+    return backend
@@ -1,25 +1,101 @@
-# gets big txt file to search though and give You only words with 5WORD_LENGTH letters
+# gets big txt file to search though and writes words of chosen lengths, every length to its own file
+# file is read once, line by line, so memory use does not depend on its size
+# with --processes N the file is cut into N parts (on line ends) which are processed in parallel and joined after
+# usage: python short_list_of_words.py [file] [--lengths 5 6 7] [--processes N] [--output-dir DIR]
 
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import os
+import shutil
 
 WORD_LENGTH = 5
 DIR_PATH = os.path.dirname(os.path.realpath(__file__))
 FILE = 'slowa.txt'
 NEW_FILE = 'slowa_piecioliterowe.txt'
+OUTPUT_PATTERN = 'slowa_{length}_literowe.txt'
+BUFFER_SIZE = 1 << 20
 
-def write_file(file_name, mode, slowa):
-    with open(file_name, mode, encoding='utf-8') as f:
-        for i in slowa:
-            f.write(i + '\n')
 
-with open(f'{DIR_PATH}\\{FILE}', "r", encoding='utf-8', newline='\n') as f:
-    nowe_slowa = []
-    for i in f:
-        slowo, _ = i.split('\r')
-        if WORD_LENGTH == len(slowo):
-            nowe_slowa.append(slowo)
+def output_name(length):
+    return NEW_FILE if length == WORD_LENGTH else OUTPUT_PATTERN.format(length=length)
 
+
+# lengths - set of lengths to keep, None keeps every length
+def extract(file_name, outputs, lengths=None, start=0, end=None):
+    files = {}
     try:
-        write_file(f'{DIR_PATH}\\{NEW_FILE}', 'x', nowe_slowa)
-    except FileExistsError:
-        write_file(f'{DIR_PATH}\\{NEW_FILE}', 'w', nowe_slowa)
\ No newline at end of file
+        with open(file_name, 'rb') as f:
+            f.seek(start)
+            position = start
+            for line in f:
+                if end is not None and position >= end:
+                    break
+                position += len(line)
+                word = line.decode('utf-8-sig' if position == len(line) else 'utf-8').strip()
+                if not word:
+                    continue
+                length = len(word)
+                if lengths is not None and length not in lengths:
+                    continue
+                if length not in files:
+                    files[length] = open(outputs(length), 'w', encoding='utf-8', buffering=BUFFER_SIZE)
+                files[length].write(word + '\n')
+    finally:
+        for f in files.values():
+            f.close()
+    return sorted(files)
+
+
+# byte offsets where parts start, every offset is start of a line
+def split_points(file_name, parts):
+    size = os.path.getsize(file_name)
+    points = [0]
+    with open(file_name, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts, points[-1]))
+            f.readline()
+            points.append(min(f.tell(), size))
+    points.append(size)
+    return points
+
+
+def part_path(output_dir, length, part):
+    return os.path.join(output_dir, f'{output_name(length)}.part{part}')
+
+
+def extract_part(args):
+    file_name, output_dir, lengths, part, start, end = args
+    return extract(file_name, lambda length: part_path(output_dir, length, part), lengths, start, end)
+
+
+def short_list_of_words(file_name, output_dir, lengths=None, processes=1):
+    if processes <= 1:
+        return extract(file_name, lambda length: os.path.join(output_dir, output_name(length)), lengths)
+
+    points = split_points(file_name, processes)
+    jobs = [(file_name, output_dir, lengths, part, start, end) for part, (start, end) in enumerate(zip(points, points[1:]))]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        found = sorted(set().union(*executor.map(extract_part, jobs)))
+
+    # join parts in order, so words stay in the same order as in source file
+    for length in found:
+        with open(os.path.join(output_dir, output_name(length)), 'wb') as output:
+            for part in range(len(jobs)):
+                path = part_path(output_dir, length, part)
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        shutil.copyfileobj(f, output, BUFFER_SIZE)
+                    os.remove(path)
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write words of chosen lengths from big word list to separate files')
+    parser.add_argument('file', nargs='?', default=os.path.join(DIR_PATH, FILE))
+    parser.add_argument('--lengths', type=int, nargs='*', default=[WORD_LENGTH], help='lengths to keep, empty list keeps all')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--output-dir', default=DIR_PATH)
+    args = parser.parse_args()
+    lengths = set(args.lengths) if args.lengths else None
+    written = short_list_of_words(args.file, args.output_dir, lengths, args.processes)
+    print('Written:', ', '.join(output_name(length) for length in written))
@@ -0,0 +1,92 @@
+// analysis charts drawn in browser with BokehJS (bokeh.js + bokeh-api.js) from data of /api/charts/<name>
+// every plot of data.plots is {type: 'bar' | 'heatmap', title, x, x_label, y_label, height, ...}, see bar_plot_data and heatmap_plot_data in app.py
+
+function barPlot(spec) {
+    const colors = Array.isArray(spec.color) ? spec.color : spec.x.map(() => spec.color);
+    const source = new Bokeh.ColumnDataSource({data: {x: spec.x, top: spec.top, color: colors}});
+
+    const plot = Bokeh.Plotting.figure({
+        x_range: spec.x,
+        height: spec.height,
+        sizing_mode: "stretch_width",
+        title: spec.title,
+        toolbar_location: null,
+        tools: ""
+    });
+
+    const glyph = {x: {field: "x"}, top: {field: "top"}, width: spec.width, color: {field: "color"}, alpha: 0.7, source: source};
+    if (spec.legend) {
+        glyph.legend_label = spec.legend;
+    }
+    plot.vbar(glyph);
+
+    plot.xgrid.grid_line_color = null;
+    plot.y_range.start = 0;
+    plot.xaxis.axis_label = spec.x_label;
+    plot.yaxis.axis_label = spec.y_label;
+    plot.xaxis.major_label_orientation = spec.label_orientation;
+    return plot;
+}
+
+function heatmapPlot(spec) {
+    const xs = [], ys = [], counts = [];
+    spec.y.forEach((y, i) => {
+        spec.x.forEach((x, j) => {
+            xs.push(x);
+            ys.push(y);
+            counts.push(spec.counts[i][j]);
+        });
+    });
+    const source = new Bokeh.ColumnDataSource({data: {x: xs, y: ys, count: counts}});
+    const mapper = new Bokeh.LinearColorMapper({palette: Bokeh.Palettes.Viridis256, low: 0, high: Math.max(1, ...counts)});
+
+    const plot = Bokeh.Plotting.figure({
+        x_range: spec.x,
+        y_range: spec.y.slice().reverse(),
+        height: spec.height,
+        sizing_mode: "stretch_width",
+        title: spec.title,
+        toolbar_location: null,
+        tools: ""
+    });
+
+    plot.rect({x: {field: "x"}, y: {field: "y"}, width: 1, height: 1, fill_color: {field: "count", transform: mapper}, line_color: null, source: source});
+    plot.add_layout(new Bokeh.ColorBar({color_mapper: mapper}), "right");
+    plot.add_tools(new Bokeh.HoverTool({tooltips: [[spec.y_label, "@y"], [spec.x_label, "@x"], ["Count", "@count"]]}));
+
+    plot.grid.grid_line_color = null;
+    plot.axis.axis_line_color = null;
+    plot.xaxis.axis_label = spec.x_label;
+    plot.yaxis.axis_label = spec.y_label;
+    return plot;
+}
+
+function makePlot(spec) {
+    return spec.type === "heatmap" ? heatmapPlot(spec) : barPlot(spec);
+}
+
+// draws plots of chart data from url, plot i into element targets[i]
+// error message (e.g. no data, no permission) is written to errorElement
+function loadCharts(url, targets, errorElement, subtitleElement) {
+    return fetch(url, {credentials: "same-origin", headers: {"Accept": "application/json"}})
+        .then(response => response.json().then(data => ({ok: response.ok, data: data})))
+        .then(({ok, data}) => {
+            if (!ok) {
+                errorElement.textContent = data.error || "There was an issue getting chart data";
+                errorElement.classList.remove("d-none");
+                return;
+            }
+            if (subtitleElement && data.subtitle) {
+                subtitleElement.textContent = data.subtitle;
+            }
+            data.plots.forEach((spec, i) => {
+                if (targets[i]) {
+                    Bokeh.Plotting.show(makePlot(spec), targets[i]);
+                }
+            });
+        })
+        .catch(() => {
+            errorElement.textContent = "There was an issue getting chart data";
+            errorElement.classList.remove("d-none");
+        });
+}
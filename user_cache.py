@@ -0,0 +1,57 @@
+# cache of logged in users for login_manager.user_loader, so authorization of request does not query database
+# entries are plain snapshots (id, username, role) of User row, not ORM objects, so they can be shared by requests
+# and threads, routes which change or delete user remove its entry (invalidate), entry is also dropped after ttl
+# seconds, so change made by other worker process is seen at latest after ttl
+# least recently used entries are removed when there is more than max_size of them
+
+from collections import OrderedDict
+from flask_login import UserMixin
+import threading
+import time
+
+
+class CachedUser(UserMixin):
+    def __init__(self, id, username, role_id, role_name):
+        self.id = id
+        self.username = username
+        self.role_id = role_id
+        self.role_name = role_name
+
+
+class UserCache:
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # user id -> (expires, CachedUser or None)
+        self.lock = threading.Lock()
+        self.generation = 0  # bumped by invalidate, loaded user is not saved if it changed meanwhile
+
+    # load(user_id) returns CachedUser or None (no such user), it runs outside of the lock
+    def get_or_load(self, user_id, load):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                return entry[1]
+            generation = self.generation
+
+        user = load(user_id)
+
+        with self.lock:
+            if self.generation == generation:
+                self.entries[user_id] = (now + self.ttl, user)
+                self.entries.move_to_end(user_id)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+            self.generation += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
@@ -0,0 +1,142 @@
+# in-memory index of words used by the word finder (/found_words, see finder.Constraints)
+# every word gets a bitmask of letters it contains, and for every letter and every position
+# we keep a set of word ids, so include / exclude / exact place filters are just set operations
+
+import threading
+
+POLSKI_ALFABET = 'aąbcćdeęfghijklłmnńoópqrsśtuvwxyzźż'
+WORD_LENGTH = 5
+
+
+class WordIndex:
+    def __init__(self, alphabet=POLSKI_ALFABET, word_length=WORD_LENGTH):
+        self.word_length = word_length
+        self.bits = {letter: 1 << i for i, letter in enumerate(alphabet)}
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.contents = {}   # id -> content
+        self.masks = {}      # id -> bitmask of letters in content
+        self.letter_ids = {}  # letter -> set of ids containing letter
+        self.position_ids = [dict() for _ in range(self.word_length)]  # position -> letter -> set of ids
+        self.all_ids = set()
+
+    def __len__(self):
+        return len(self.all_ids)
+
+    def words(self):
+        with self.lock:
+            return set(self.contents.values())
+
+    # (number of words, last id), compared with the same of Word table to see if index is behind database
+    def version(self):
+        with self.lock:
+            return len(self.all_ids), max(self.all_ids, default=None)
+
+    # letters outside of the alphabet get their own bit, so they still can be excluded
+    def bit(self, letter):
+        if letter not in self.bits:
+            self.bits[letter] = 1 << len(self.bits)
+        return self.bits[letter]
+
+    def mask(self, content):
+        mask = 0
+        for letter in content:
+            mask |= self.bit(letter)
+        return mask
+
+    # fill index from iterable of (id, content) pairs
+    def build(self, rows):
+        with self.lock:
+            self.clear()
+            for id, content in rows:
+                self._add(id, content)
+        return self
+
+    def add(self, id, content):
+        with self.lock:
+            self._add(id, content)
+
+    def remove(self, id):
+        with self.lock:
+            if id in self.contents:
+                self._remove_unlocked(id)
+
+    def _add(self, id, content):
+        content = content.lower()
+        if id in self.contents:
+            self._remove_unlocked(id)
+        self.contents[id] = content
+        self.masks[id] = self.mask(content)
+        self.all_ids.add(id)
+        for letter in set(content):
+            self.letter_ids.setdefault(letter, set()).add(id)
+        for position, letter in enumerate(content[:self.word_length]):
+            self.position_ids[position].setdefault(letter, set()).add(id)
+
+    def _remove_unlocked(self, id):
+        content = self.contents.pop(id)
+        self.masks.pop(id, None)
+        self.all_ids.discard(id)
+        for letter in set(content):
+            self.letter_ids[letter].discard(id)
+        for position, letter in enumerate(content[:self.word_length]):
+            self.position_ids[position][letter].discard(id)
+
+    # include - letters that have to be in word
+    # exclude - letters that can not be in word
+    # positions - list of letters per position, '' or '-' means any letter
+    # returns set of matching ids
+    def search(self, include=(), exclude=(), positions=()):
+        with self.lock:
+            return self._search(include, exclude, positions)
+
+    # finder.Constraints: parts which can be answered with sets are, the rest is checked with compiled regex
+    def search_constraints(self, constraints):
+        include = [l for l in constraints.included if len(l) == 1] + list(constraints.at_position) + list(constraints.not_at_position)
+        exclude = [l for l in constraints.excluded if len(l) == 1]
+        positions = [constraints.positions.get(p, '') for p in range(self.word_length)]
+        with self.lock:
+            result = self._search(include, exclude, positions)
+            if constraints.needs_check():
+                contents = self.contents
+                result = {id for id in result if constraints.match(contents[id])}
+            return result
+
+    def _search(self, include, exclude, positions):
+        candidates = [self.letter_ids.get(letter, set()) for letter in include if letter]
+        for position, letter in enumerate(positions):
+            if letter and letter != '-' and position < self.word_length:
+                candidates.append(self.position_ids[position].get(letter, set()))
+
+        if candidates:
+            candidates.sort(key=len)
+            result = set(candidates[0])
+            for ids in candidates[1:]:
+                result &= ids
+                if not result:
+                    break
+        else:
+            result = set(self.all_ids)
+
+        exclude_mask = 0
+        for letter in exclude:
+            if letter:
+                exclude_mask |= self.bit(letter)
+
+        if exclude_mask:
+            masks = self.masks
+            result = {id for id in result if not masks[id] & exclude_mask}
+
+        return result
+
+
+# read words from a plain text utf-8 word list, one word per line (any line endings)
+# word_length=None gives words of every length
+def read_words_file(path, word_length=WORD_LENGTH):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            word = line.strip()
+            if word and (word_length is None or len(word) == word_length):
+                yield word
@@ -0,0 +1,52 @@
+# letter statistics of words, counted with numpy over array of letter codes
+# words are coded as (n, word_length) array, letter = its index in alphabet, -1 for letters outside alphabet
+# or places after end of shorter words
+
+import numpy as np
+from word_index import POLSKI_ALFABET, WORD_LENGTH
+
+DIACRITICS = 'ąćęłńóśźż'
+
+
+def encode_words(words, alphabet=POLSKI_ALFABET, word_length=WORD_LENGTH):
+    letters = {letter: i for i, letter in enumerate(alphabet)}
+    codes = np.full((len(words), word_length), -1, dtype=np.int16)
+    for i, word in enumerate(words):
+        codes[i, :len(word)] = [letters.get(letter, -1) for letter in word.lower()[:word_length]]
+    return codes
+
+
+class WordStats:
+    def __init__(self, words, alphabet=POLSKI_ALFABET, word_length=WORD_LENGTH):
+        self.alphabet = alphabet
+        self.word_length = word_length
+        self.words_count = len(words)
+        codes = encode_words(words, alphabet, word_length)
+        k = len(alphabet)
+
+        # letter x position
+        valid = codes >= 0
+        positions = np.broadcast_to(np.arange(word_length), codes.shape)
+        self.letter_position = np.bincount((codes * word_length + positions)[valid], minlength=k * word_length).reshape(k, word_length)
+        self.letters = self.letter_position.sum(axis=1)
+
+        # pairs of neighbouring letters, first letter x second letter
+        first, second = codes[:, :-1], codes[:, 1:]
+        pairs = (first >= 0) & (second >= 0)
+        self.bigrams = np.bincount((first * k + second)[pairs], minlength=k * k).reshape(k, k)
+
+        # diacritic letters, all their occurrences and number of words with at least one of them
+        diacritic_codes = np.array([alphabet.index(d) for d in DIACRITICS if d in alphabet])
+        self.diacritics = {alphabet[c]: int(self.letters[c]) for c in diacritic_codes}
+        self.words_with_diacritics = int(np.isin(codes, diacritic_codes).any(axis=1).sum())
+
+    # {letter: [count on position 0, 1, ...]}
+    def letter_position_dict(self):
+        return {letter: self.letter_position[i].tolist() for i, letter in enumerate(self.alphabet)}
+
+    # most common bigrams as list of (bigram, count)
+    def top_bigrams(self, top=30):
+        k = len(self.alphabet)
+        flat = self.bigrams.ravel()
+        order = np.argsort(flat, kind='stable')[::-1][:top]
+        return [(self.alphabet[i // k] + self.alphabet[i % k], int(flat[i])) for i in order if flat[i] > 0]
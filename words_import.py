@@ -0,0 +1,198 @@
+# streaming bulk import of word list into Word table
+# words are inserted in chunks with executemany, words already in database are skipped (their stats stay untouched)
+# with --sync only difference between word list and Word table is written, optionally marking words gone from the list
+# on PostgreSQL words are sent with COPY (see pg_copy.py) instead of INSERT of every row
+# usage: python words_import.py [file] [--chunk-size N] [--length N] [--sync [--flag-removed]]
+
+from app import app, db, Word, rebuild_first_letter_counts, prepare_database
+from database_config import sqlite_pragmas, SQLITE_DEFAULT_PRAGMAS
+from word_index import read_words_file, WORD_LENGTH
+from pg_copy import copy_rows
+from sqlalchemy import func, literal, select, table as sql_table, column as sql_column
+from datetime import datetime
+from sqlalchemy.dialects import sqlite, postgresql
+import argparse
+import os
+import time
+
+DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+WORDS_FILE = 'slowa_piecioliterowe.txt'
+CHUNK_SIZE = 5000
+SOURCE = 'Default from dictionary'
+ADDED_BY = 'Admin'
+
+# pragmas used only for time of import
+SQLITE_LOAD_PRAGMAS = [
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',
+]
+
+
+# connection goes back to pool with the same settings as every other connection of app (database_config.py)
+SQLITE_RESTORE_PRAGMAS = SQLITE_DEFAULT_PRAGMAS + sqlite_pragmas()
+
+
+# synchronous=OFF can leave database corrupted after crash or power cut during import, so it is used only to seed
+# empty Word table (then database is just made again from file), import merged into database holding users' data,
+# stats and history keeps NORMAL, which costs little in WAL mode (database_config.py)
+def sqlite_load_pragmas(word_table_empty):
+    return [f"PRAGMA synchronous={'OFF' if word_table_empty else 'NORMAL'}"] + SQLITE_LOAD_PRAGMAS
+
+
+# INSERT which skips rows with content already in table
+def insert_or_skip(table, dialect_name):
+    if dialect_name == 'sqlite':
+        return sqlite.insert(table).on_conflict_do_nothing(index_elements=['content'])
+    if dialect_name == 'postgresql':
+        return postgresql.insert(table).on_conflict_do_nothing(index_elements=['content'])
+    return table.insert().prefix_with('IGNORE')
+
+
+def chunks(words, chunk_size):
+    chunk = []
+    for word in words:
+        chunk.append(word)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# words are copied to temporary table and inserted from there, skipping words already in Word table
+def copy_or_skip(connection, table, chunks_of_words, source, added_by, progress=None):
+    connection.exec_driver_sql('CREATE TEMPORARY TABLE word_import (content text) ON COMMIT DROP')
+    read = 0
+    for chunk in chunks_of_words:
+        read += copy_rows(connection, 'word_import', ['content'], ((word,) for word in chunk))
+        if progress:
+            progress(read)
+    imported = sql_table('word_import', sql_column('content'))
+    connection.execute(postgresql.insert(table)
+                       .from_select(['content', 'searched', 'source', 'added_by'],
+                                    select(imported.c.content, literal(0), literal(source), literal(added_by)).distinct())
+                       .on_conflict_do_nothing(index_elements=['content']))
+    return read
+
+
+# words which are not in Word table yet
+def insert_new_words(connection, table, words, chunk_size, source, added_by):
+    for chunk in chunks(words, chunk_size):
+        if connection.dialect.name == 'postgresql':
+            copy_rows(connection, table.name, ['content', 'searched', 'source', 'added_by'],
+                      ((word, 0, source, added_by) for word in chunk))
+        else:
+            connection.execute(table.insert(), [
+                {'content': word, 'searched': 0, 'source': source, 'added_by': added_by}
+                for word in chunk
+            ])
+
+
+def run_pragmas(connection, pragmas):
+    for pragma in pragmas:
+        connection.exec_driver_sql(pragma)
+    connection.commit()
+
+
+# returns (number of words read, number of words inserted)
+def import_words(path, chunk_size=CHUNK_SIZE, word_length=WORD_LENGTH, source=SOURCE, added_by=ADDED_BY, progress=print):
+    table = Word.__table__
+    read = 0
+    begin = time.time()
+    with app.app_context():
+        engine = db.engine
+        dialect_name = engine.dialect.name
+        statement = insert_or_skip(table, dialect_name)
+        with engine.connect() as connection:
+            if dialect_name == 'sqlite':
+                run_pragmas(connection, sqlite_load_pragmas(connection.execute(select(table.c.id).limit(1)).first() is None))
+            try:
+                with connection.begin():
+                    before = connection.execute(func.count(table.c.id).select()).scalar()
+                    if dialect_name == 'postgresql':
+                        read = copy_or_skip(connection, table, chunks(read_words_file(path, word_length), chunk_size), source, added_by,
+                                            progress and (lambda read: progress(f"Copied {read} words, {time.time() - begin:.2f}s")))
+                    else:
+                        for chunk in chunks(read_words_file(path, word_length), chunk_size):
+                            connection.execute(statement, [
+                                {'content': word, 'searched': 0, 'source': source, 'added_by': added_by}
+                                for word in chunk
+                            ])
+                            read += len(chunk)
+                            if progress:
+                                progress(f"Read {read} words, {time.time() - begin:.2f}s")
+                    inserted = connection.execute(func.count(table.c.id).select()).scalar() - before
+            finally:
+                if dialect_name == 'sqlite':
+                    run_pragmas(connection, SQLITE_RESTORE_PRAGMAS)
+
+        # bulk insert skips Word mapper events, so first letter counts are rebuilt at once
+        if inserted:
+            rebuild_first_letter_counts()
+
+    if progress:
+        progress(f"Imported {inserted} new words of {read} read ({read - inserted} skipped) in {time.time() - begin:.2f}s")
+    return read, inserted
+
+
+# compare word list with Word table using sets and write only the difference, all in one transaction
+# new words are inserted, dictionary words missing from list get removed_from_dictionary date when flag_removed,
+# flagged words which are back in list are unflagged; searched, definitions and dates of other words are not touched
+# returns dict with numbers of words in each group
+def sync_words(path, flag_removed=False, chunk_size=CHUNK_SIZE, word_length=WORD_LENGTH, source=SOURCE, added_by=ADDED_BY, progress=print):
+    begin = time.time()
+    file_words = set(read_words_file(path, word_length))
+    with app.app_context():
+        prepare_database()
+        table = Word.__table__
+        with db.engine.begin() as connection:
+            existing = {}
+            dictionary_words = set()
+            flagged = set()
+            for id, content, word_source, removed in connection.execute(
+                    db.select(table.c.id, table.c.content, table.c.source, table.c.removed_from_dictionary)):
+                existing[content] = id
+                if word_source == source:
+                    dictionary_words.add(content)
+                if removed is not None:
+                    flagged.add(content)
+
+            new_words = sorted(file_words - existing.keys())
+            removed_words = sorted(dictionary_words - file_words - flagged) if flag_removed else []
+            restored_words = sorted(flagged & file_words)
+
+            insert_new_words(connection, table, new_words, chunk_size, source, added_by)
+            now = datetime.now()
+            for chunk in chunks(removed_words, chunk_size):
+                connection.execute(table.update().where(table.c.id.in_([existing[word] for word in chunk])).values(removed_from_dictionary=now))
+            for chunk in chunks(restored_words, chunk_size):
+                connection.execute(table.update().where(table.c.id.in_([existing[word] for word in chunk])).values(removed_from_dictionary=None))
+
+        if new_words:
+            rebuild_first_letter_counts()
+
+    stats = {
+        'in_file': len(file_words),
+        'in_database': len(existing),
+        'inserted': len(new_words),
+        'flagged_removed': len(removed_words),
+        'restored': len(restored_words),
+        'unchanged': len(file_words) - len(new_words)
+    }
+    if progress:
+        progress(f"Synced in {time.time() - begin:.2f}s: " + ', '.join(f'{key}={value}' for key, value in stats.items()))
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Import word list into Word table')
+    parser.add_argument('file', nargs='?', default=os.path.join(DIR_PATH, WORDS_FILE))
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--length', type=int, default=WORD_LENGTH, help='only words of this length, 0 for all')
+    parser.add_argument('--sync', action='store_true', help='write only difference between file and database')
+    parser.add_argument('--flag-removed', action='store_true', help='with --sync, mark dictionary words missing from file')
+    args = parser.parse_args()
+    if args.sync:
+        sync_words(args.file, flag_removed=args.flag_removed, chunk_size=args.chunk_size, word_length=args.length or None)
+    else:
+        import_words(args.file, chunk_size=args.chunk_size, word_length=args.length or None)